@@ -0,0 +1,199 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from airport.conditional import ConditionalGetMixin
+from airport.response_cache import CachedResponseMixin
+from airport.route_graph import aget_route_graph
+from airport.versions import RequestVersionsMixin
+from airport.views import AirportViewSet, FlightViewSet, RouteViewSet
+
+
+async def _paginate_by_page_number(paginator, queryset, request):
+    """PageNumberPagination.paginate_queryset with an async COUNT and fetch"""
+    paginator.request = request
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None
+
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(request, django_paginator)
+    try:
+        paginator.page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(
+            paginator.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+        )
+    paginator.page.object_list = [
+        instance async for instance in paginator.page.object_list
+    ]
+    if django_paginator.num_pages > 1 and paginator.template is not None:
+        paginator.display_page_controls = True
+    return paginator.page.object_list
+
+
+class AsyncReadView(View):
+    """Serve GET requests of a DRF viewset route without a thread.
+
+    The viewset is set up as DRF would do it, so its queryset,
+    serializers, permissions, throttles, pagination and response cache
+    are reused and responses are identical. Authentication, throttle
+    checks and the version counters behind the ETag and the response
+    cache run in one sync_to_async call, so no cache round trip blocks
+    the event loop; database reads use the async ORM and responses are
+    rendered as JSON only. Other methods are passed on to the regular
+    sync view.
+    """
+
+    viewset_class = None
+    actions = None
+    basename = None
+    detail = False
+    sync_view = None
+    # dispatch() serves every method, there are no per-method handlers
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        initkwargs["sync_view"] = cls.viewset_class.as_view(
+            dict(initkwargs["actions"]),
+            basename=initkwargs["basename"],
+            detail=initkwargs.get("detail", False),
+        )
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def get_viewset(self, request, *args, **kwargs):
+        """Instantiate the viewset the way ViewSetMixin.as_view does"""
+        actions = dict(self.actions, head=self.actions["get"])
+        viewset = self.viewset_class(
+            basename=self.basename, detail=self.detail
+        )
+        viewset.action_map = actions
+        for method, action in actions.items():
+            setattr(viewset, method, getattr(viewset, action))
+        viewset.args = args
+        viewset.kwargs = kwargs
+        viewset.format_kwarg = None
+        viewset.renderer_classes = [JSONRenderer]
+        viewset.request = viewset.initialize_request(
+            request, *args, **kwargs
+        )
+        viewset.headers = viewset.default_response_headers
+        return viewset
+
+    @staticmethod
+    def check_access(viewset, request):
+        """Authenticate, run permission and throttle checks and read the
+        version counters behind the ETag and the response cache key"""
+        viewset.perform_authentication(request)
+        viewset.check_permissions(request)
+        viewset.check_throttles(request)
+        if isinstance(viewset, RequestVersionsMixin):
+            viewset.request_versions()
+        if isinstance(viewset, ConditionalGetMixin):
+            viewset.check_not_modified(request)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs
+            )
+
+        viewset = self.get_viewset(request, *args, **kwargs)
+        request = viewset.request
+        try:
+            neg = viewset.perform_content_negotiation(request)
+            request.accepted_renderer, request.accepted_media_type = neg
+            await sync_to_async(self.check_access)(viewset, request)
+            handler = getattr(self, viewset.action)
+            if isinstance(viewset, CachedResponseMixin):
+                response = await viewset.acached_response(
+                    handler, request, viewset, **kwargs
+                )
+            else:
+                response = await handler(request, viewset, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        response = viewset.finalize_response(request, response)
+        response.render()
+        rendered = HttpResponse(
+            response.content, status=response.status_code
+        )
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    def get_queryset(self, viewset):
+        return viewset.filter_queryset(viewset.get_queryset())
+
+    async def list(self, request, viewset, **kwargs):
+        if getattr(viewset, "fast_list", None) is not None:
+            fields = viewset.get_fast_list_fields()
+            queryset = viewset.get_fast_list_queryset(fields)
+            to_representation = viewset.fast_list.row_function(fields)
+
+            def serialize(rows):
+                return [to_representation(row) for row in rows]
+        else:
+            queryset = self.get_queryset(viewset)
+
+            def serialize(instances):
+                return viewset.get_serializer(instances, many=True).data
+
+        paginator = viewset.paginator
+        if paginator is None:
+            page = None
+        elif isinstance(paginator, PageNumberPagination):
+            page = await _paginate_by_page_number(
+                paginator, queryset, request
+            )
+        else:
+            page = await sync_to_async(paginator.paginate_queryset)(
+                queryset, request, viewset
+            )
+
+        if page is not None:
+            return viewset.get_paginated_response(serialize(page))
+
+        return Response(serialize([instance async for instance in queryset]))
+
+    async def retrieve(self, request, viewset, **kwargs):
+        queryset = self.get_queryset(viewset)
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{viewset.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches "
+                f"the given query."
+            )
+        viewset.check_object_permissions(request, instance)
+        return Response(viewset.get_serializer(instance).data)
+
+
+class AsyncAirportView(AsyncReadView):
+    viewset_class = AirportViewSet
+
+
+class AsyncRouteView(AsyncReadView):
+    viewset_class = RouteViewSet
+
+    async def list(self, request, viewset, **kwargs):
+        routes = viewset.get_route_list(await aget_route_graph())
+        return Response(viewset.get_route_list_data(routes))
+
+
+class AsyncFlightView(AsyncReadView):
+    viewset_class = FlightViewSet
@@ -0,0 +1,118 @@
+import operator
+from functools import reduce
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airport.models import Flight, SeatHold, Ticket
+from airport.versions import bump_version
+
+
+def lock_flights(flight_ids):
+    """Lock flight rows in id order and return them with their airplanes"""
+    return {
+        flight.id: flight
+        for flight in Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .filter(id__in=flight_ids)
+        .order_by("id")
+    }
+
+
+def active_holds(flight_ids, now=None):
+    """Map (flight_id, row, seat) of unexpired seat holds to the holder"""
+    return {
+        (flight_id, row, seat): user_id
+        for flight_id, row, seat, user_id in SeatHold.objects.filter(
+            flight_id__in=flight_ids, expires_at__gt=now or timezone.now()
+        ).values_list("flight_id", "row", "seat", "user_id")
+    }
+
+
+def book_tickets(order, tickets_data):
+    """Create all tickets of an order with a single INSERT.
+
+    The flights are locked and loaded with their airplanes in one query,
+    every seat is checked in memory against the airplane bounds, the
+    other seats of the order, the flight's seat map and seats held by
+    other users, and seat maps and available ticket counters are
+    updated under the same lock. The user's own holds on the booked
+    seats are released. Errors are reported per ticket, in the order
+    they were given.
+    """
+    with transaction.atomic():
+        flights = lock_flights(
+            {ticket_data["flight"].id for ticket_data in tickets_data}
+        )
+        seat_maps = {
+            flight_id: flight.get_seat_map()
+            for flight_id, flight in flights.items()
+        }
+        holds = active_holds(flights)
+
+        errors = []
+        for ticket_data in tickets_data:
+            flight = flights[ticket_data["flight"].id]
+            row, seat = ticket_data["row"], ticket_data["seat"]
+            try:
+                Ticket.validate_ticket(
+                    row, seat, flight.airplane, ValidationError
+                )
+                if seat_maps[flight.id].is_taken(row, seat):
+                    raise ValidationError(
+                        {
+                            "seat": f"Seat (row: {row}, seat: {seat}) "
+                            f"is already taken on this flight."
+                        }
+                    )
+                holder_id = holds.get((flight.id, row, seat))
+                if holder_id not in (None, order.user_id):
+                    raise ValidationError(
+                        {
+                            "seat": f"Seat (row: {row}, seat: {seat}) "
+                            f"is held by another customer."
+                        }
+                    )
+            except ValidationError as error:
+                errors.append(error.detail)
+                continue
+            seat_maps[flight.id].take(row, seat)
+            errors.append({})
+
+        if any(errors):
+            raise ValidationError({"tickets": errors})
+
+        try:
+            with transaction.atomic():
+                tickets = Ticket.objects.bulk_create(
+                    [
+                        Ticket(
+                            order=order,
+                            flight=flights[ticket_data["flight"].id],
+                            row=ticket_data["row"],
+                            seat=ticket_data["seat"],
+                        )
+                        for ticket_data in tickets_data
+                    ]
+                )
+        except IntegrityError:
+            raise ValidationError(
+                {
+                    "tickets": "Some of the selected seats have just been "
+                    "taken. Please choose other seats."
+                }
+            )
+
+        for flight_id, flight in flights.items():
+            flight._store_seat_map(seat_maps[flight_id])
+        held_seats = [
+            Q(flight_id=ticket.flight_id, row=ticket.row, seat=ticket.seat)
+            for ticket in tickets
+            if (ticket.flight_id, ticket.row, ticket.seat) in holds
+        ]
+        if held_seats:
+            SeatHold.objects.filter(reduce(operator.or_, held_seats)).delete()
+        bump_version("ticket")
+        return tickets
@@ -0,0 +1,93 @@
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from airport.versions import RequestVersionsMixin
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+    def __init__(self, etag):
+        super().__init__()
+        self.etag = etag
+
+
+class ConditionalGetMixin(RequestVersionsMixin):
+    """Strong ETags and 304 responses for list and retrieve.
+
+    The ETag is a hash of the request (view, action, URL kwargs, query
+    parameters, media type and, with ``etag_per_user``, the user) and
+    of the version counters from ``get_etag_versions``. It is compared
+    with If-None-Match right after the permission checks, so a matching
+    request is answered before any queryset is evaluated.
+    """
+
+    etag_versions = ()
+    etag_per_user = False
+    etag_actions = ("list", "retrieve")
+
+    def get_etag_versions(self):
+        return self.etag_versions
+
+    def get_request_version_names(self):
+        names = super().get_request_version_names()
+        if getattr(self, "action", "retrieve") in self.etag_actions:
+            names = (*names, *self.get_etag_versions())
+        return names
+
+    def get_etag(self, request):
+        query = sorted(
+            (name, tuple(values))
+            for name, values in request.query_params.lists()
+        )
+        key = (
+            type(self).__name__,
+            getattr(self, "action", None),
+            sorted(self.kwargs.items()),
+            query,
+            request.accepted_media_type,
+            request.user.pk if self.etag_per_user else None,
+            self.request_versions(*self.get_etag_versions()),
+        )
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16)
+        return quote_etag(digest.hexdigest())
+
+    def check_not_modified(self, request):
+        """Set self.etag and raise NotModified if the client has it"""
+        self.etag = None
+        if request.method not in ("GET", "HEAD"):
+            return
+        if getattr(self, "action", "retrieve") not in self.etag_actions:
+            return
+
+        self.etag = self.get_etag(request)
+        if_none_match = request.headers.get("If-None-Match")
+        # "*" is not honoured: the check runs before the object is
+        # looked up, so it can't tell whether a representation exists
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if any(etag.removeprefix("W/") == self.etag for etag in etags):
+                raise NotModified(self.etag)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.check_not_modified(request)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(
+                status=exc.status_code, headers={"ETag": exc.etag}
+            )
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, "etag", None) and response.status_code == 200:
+            response["ETag"] = self.etag
+        return response
@@ -0,0 +1,169 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.http import StreamingHttpResponse
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+from airport.models import Ticket
+
+EXPORT_CHUNK_SIZE = 2000
+
+OUTPUT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Columns map to None for fields of the exported model or to an
+# expression computed by the database
+FLIGHT_COLUMNS = {
+    "id": None,
+    "full_route": Concat(
+        "route__source__name", Value(" - "), "route__destination__name"
+    ),
+    "departure_time": None,
+    "arrival_time": None,
+    "airplane_name": F("airplane__name"),
+    "capacity": F("airplane__rows") * F("airplane__seats_in_row"),
+    "tickets_available": None,
+}
+
+ORDER_COLUMNS = {
+    "order_id": None,
+    "created_at": F("order__created_at"),
+    "id": None,
+    "row": None,
+    "seat": None,
+    "flight_id": None,
+    "full_route": Concat(
+        "flight__route__source__name",
+        Value(" - "),
+        "flight__route__destination__name",
+    ),
+    "departure_time": F("flight__departure_time"),
+    "arrival_time": F("flight__arrival_time"),
+}
+
+output_parameter = OpenApiParameter(
+    name="output",
+    description="Export format, 'ndjson' (default) or 'csv'",
+    required=False,
+    type=str,
+    enum=list(OUTPUT_CONTENT_TYPES),
+)
+
+
+def export_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield ``columns`` of a queryset as dicts.
+
+    Rows are read with a server-side cursor, ``chunk_size`` at a time,
+    and never cached by the queryset.
+    """
+    fields = [name for name, column in columns.items() if column is None]
+    expressions = {
+        name: column for name, column in columns.items() if column is not None
+    }
+    rows = queryset.values(*fields, **expressions)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield {
+            name: (
+                row[name].isoformat()
+                if isinstance(row[name], datetime)
+                else row[name]
+            )
+            for name in columns
+        }
+
+
+def flight_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Flights of a queryset with their capacity and free seats"""
+    return export_rows(
+        queryset.order_by("departure_time", "arrival_time", "id"),
+        FLIGHT_COLUMNS,
+        chunk_size,
+    )
+
+
+def order_export_rows(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Tickets of a user's orders, newest order first"""
+    return export_rows(
+        Ticket.objects.filter(order__user=user).order_by(
+            "-order__created_at", "-order_id", "row", "seat"
+        ),
+        ORDER_COLUMNS,
+        chunk_size,
+    )
+
+
+class _Echo:
+    """File-like object returning what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+def encode_rows(rows, columns, output):
+    """Lines of the export in ``output`` format"""
+    if output == "csv":
+        return csv_lines(rows, columns)
+    return ndjson_lines(rows)
+
+
+def _next_lines(lines, count):
+    return list(islice(lines, count))
+
+
+async def aiter_lines(lines, chunk_size=EXPORT_CHUNK_SIZE):
+    """Async iterator over ``lines`` for ASGI responses.
+
+    Django reads a sync iterator into a list before an ASGI response
+    starts; here ``chunk_size`` lines at a time are pulled in the sync
+    thread, so the server-side cursor stays on its connection and only
+    one chunk is held in memory.
+    """
+    lines = iter(lines)
+    while True:
+        chunk = await sync_to_async(_next_lines)(lines, chunk_size)
+        if not chunk:
+            return
+        yield "".join(chunk)
+
+
+def export_response(request, rows, columns, filename):
+    """StreamingHttpResponse of the format chosen with ?output="""
+    output = request.query_params.get("output", "ndjson")
+    if output not in OUTPUT_CONTENT_TYPES:
+        raise ValidationError(
+            {
+                "output": f"Choose one of: "
+                          f"{', '.join(OUTPUT_CONTENT_TYPES)}."
+            }
+        )
+    lines = encode_rows(rows, columns, output)
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        lines = aiter_lines(lines)
+    response = StreamingHttpResponse(
+        lines, content_type=OUTPUT_CONTENT_TYPES[output]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{output}"'
+    )
+    return response
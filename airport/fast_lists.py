@@ -0,0 +1,152 @@
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import F, OuterRef, Value
+from django.db.models.functions import Concat
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from airport.models import Crew
+from airport.serializers import (
+    AirplaneListSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+)
+
+
+class ValuesList:
+    """List serializer output built from .values() rows.
+
+    ``columns`` maps every field of ``serializer_class`` to the model
+    field path or the expression that gives its value in the database.
+    Rows are turned into the serializer's output by row functions
+    compiled once per field set, which only keep DRF's formatting of
+    plain fields (dates, numbers); relational fields are selected as
+    their final value.
+    """
+
+    def __init__(self, serializer_class, **columns):
+        self.serializer_class = serializer_class
+        self.columns = columns
+        self._row_functions = {}
+
+    def key(self, name):
+        """Row key of a field; aliased unless it is its own column"""
+        return name if self.columns[name] == name else f"{name}_value"
+
+    def values(self, queryset, fields, extra=()):
+        """Select ``fields`` and the ``extra`` model fields as dicts"""
+        paths = [name for name in fields if self.key(name) == name]
+        expressions = {
+            self.key(name): (
+                F(self.columns[name])
+                if isinstance(self.columns[name], str)
+                else self.columns[name]
+            )
+            for name in fields
+            if self.key(name) != name
+        }
+        paths.extend(name for name in extra if name not in paths)
+        return queryset.prefetch_related(None).values(*paths, **expressions)
+
+    def row_function(self, fields):
+        """Function mapping a row with ``fields`` to the output dict"""
+        fields = tuple(fields)
+        if fields not in self._row_functions:
+            serializer_fields = self.serializer_class().fields
+            getters = []
+            for name in fields:
+                field = serializer_fields[name]
+                convert = (
+                    None
+                    if isinstance(
+                        field,
+                        (serializers.RelatedField,
+                         serializers.ManyRelatedField),
+                    )
+                    else field.to_representation
+                )
+                getters.append((name, self.key(name), convert))
+
+            def to_representation(row):
+                data = {}
+                for name, key, convert in getters:
+                    value = row[key]
+                    if convert is not None and value is not None:
+                        value = convert(value)
+                    data[name] = value
+                return data
+
+            self._row_functions[fields] = to_representation
+        return self._row_functions[fields]
+
+
+FLIGHT_LIST = ValuesList(
+    FlightListSerializer,
+    id="id",
+    route=Concat(
+        "route__source__name", Value(" - "), "route__destination__name"
+    ),
+    airplane="airplane__name",
+    departure_time="departure_time",
+    arrival_time="arrival_time",
+    crew=ArraySubquery(
+        Crew.objects.filter(flights=OuterRef("pk"))
+        .order_by("id")
+        .values(full_name=Concat("first_name", Value(" "), "last_name"))
+    ),
+)
+
+AIRPLANE_LIST = ValuesList(
+    AirplaneListSerializer,
+    id="id",
+    name="name",
+    capacity=F("rows") * F("seats_in_row"),
+    airplane_type="airplane_type__name",
+)
+
+# Routes are listed from the route graph, whose rows are already built
+# with a values query
+ROUTE_LIST = ValuesList(
+    RouteListSerializer,
+    id="id",
+    full_route="full_route",
+    distance="distance",
+)
+
+
+class FastListMixin:
+    """Serve list from a values query instead of model instances.
+
+    Set ``fast_list`` to the ValuesList of the list serializer to switch
+    a viewset to it; None keeps the regular serializer. The JSON is the
+    same either way, including sparse fieldsets and pagination.
+    """
+
+    fast_list = None
+
+    def get_fast_list_fields(self):
+        return tuple(self.get_serializer().fields)
+
+    def get_fast_list_queryset(self, fields):
+        # Cursor pagination reads its position from the ordering fields
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return self.fast_list.values(
+            self.filter_queryset(self.get_queryset()),
+            fields,
+            extra=[name.lstrip("-") for name in ordering],
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_list is None:
+            return super().list(request, *args, **kwargs)
+
+        fields = self.get_fast_list_fields()
+        to_representation = self.fast_list.row_function(fields)
+        queryset = self.get_fast_list_queryset(fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                [to_representation(row) for row in page]
+            )
+        return Response([to_representation(row) for row in queryset])
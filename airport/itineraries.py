@@ -0,0 +1,128 @@
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from airport.models import Flight
+from airport.route_graph import get_route_graph
+
+MAX_PARTIAL_JOURNEYS_PER_AIRPORT = 200
+
+Leg = namedtuple(
+    "Leg", ["flight_id", "source", "destination", "departure", "arrival"]
+)
+
+
+class Itinerary:
+    def __init__(self, legs, flights):
+        self.flights = [flights[leg.flight_id] for leg in legs]
+        self.departure_time = legs[0].departure
+        self.arrival_time = legs[-1].arrival
+        self.duration = self.arrival_time - self.departure_time
+        self.connections = len(legs) - 1
+
+
+def find_connections(
+    legs, source, destination, departure_until,
+    min_connection, max_duration, max_legs, legs_to_destination=None
+):
+    """Connection scan over legs sorted by departure time.
+
+    Every leg either starts a journey at ``source`` (if it departs before
+    ``departure_until``) or extends the journeys that already reached its
+    departure airport at least ``min_connection`` earlier. Journeys never
+    revisit an airport and never last longer than ``max_duration``.
+    ``legs_to_destination`` maps airports to the fewest flights needed
+    to reach ``destination``; legs to airports that cannot reach it in
+    time are skipped. Returns the journeys reaching ``destination`` as
+    tuples of legs.
+    """
+    journeys_at = defaultdict(list)
+    found = []
+
+    for leg in legs:
+        if legs_to_destination is not None and (
+            leg.destination not in legs_to_destination
+        ):
+            continue
+        candidates = [
+            journey for journey in journeys_at[leg.source]
+            if journey[-1].arrival + min_connection <= leg.departure
+        ]
+        if leg.source == source and leg.departure < departure_until:
+            candidates.append(())
+
+        for journey in candidates:
+            first_leg = journey[0] if journey else leg
+            if leg.arrival - first_leg.departure > max_duration:
+                continue
+            if leg.destination == source or any(
+                previous.source == leg.destination for previous in journey
+            ):
+                continue
+
+            extended = journey + (leg,)
+            if legs_to_destination is not None and (
+                len(extended) + legs_to_destination[leg.destination]
+                > max_legs
+            ):
+                continue
+            if leg.destination == destination:
+                found.append(extended)
+            elif len(extended) < max_legs:
+                reached = journeys_at[leg.destination]
+                if len(reached) < MAX_PARTIAL_JOURNEYS_PER_AIRPORT:
+                    reached.append(extended)
+
+    return found
+
+
+def search_itineraries(
+    source, destination, departure_from,
+    min_connection=timedelta(hours=1),
+    max_duration=timedelta(hours=24),
+    max_legs=3,
+    limit=10,
+):
+    """Find up to ``limit`` itineraries of 1 to ``max_legs`` flights.
+
+    The first flight departs within one day from ``departure_from``.
+    Itineraries are ranked by arrival time, then by number of
+    connections and by total duration.
+    """
+    departure_until = departure_from + timedelta(days=1)
+    legs = [
+        Leg(*values)
+        for values in Flight.objects.filter(
+            departure_time__gte=departure_from,
+            departure_time__lt=departure_until + max_duration,
+            tickets_available__gt=0,
+        )
+        .order_by("departure_time", "arrival_time", "id")
+        .values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        )
+    ]
+
+    journeys = find_connections(
+        legs, source, destination, departure_until,
+        min_connection, max_duration, max_legs,
+        legs_to_destination=get_route_graph().legs_to(destination, max_legs),
+    )
+    journeys.sort(
+        key=lambda journey: (
+            journey[-1].arrival,
+            len(journey),
+            journey[-1].arrival - journey[0].departure,
+        )
+    )
+    journeys = journeys[:limit]
+
+    flights = Flight.objects.select_related(
+        "route__source", "route__destination", "airplane"
+    ).prefetch_related("crew").in_bulk(
+        {leg.flight_id for journey in journeys for leg in journey}
+    )
+    return [Itinerary(journey, flights) for journey in journeys]
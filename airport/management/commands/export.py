@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.exports import (
+    EXPORT_CHUNK_SIZE,
+    FLIGHT_COLUMNS,
+    ORDER_COLUMNS,
+    OUTPUT_CONTENT_TYPES,
+    encode_rows,
+    flight_export_rows,
+    order_export_rows,
+)
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    """Django command to export flights or a user's orders."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=("flights", "orders"))
+        parser.add_argument(
+            "--user",
+            help="Email of the user whose orders are exported",
+        )
+        parser.add_argument(
+            "--output",
+            choices=tuple(OUTPUT_CONTENT_TYPES),
+            default="ndjson",
+            help="Export format",
+        )
+        parser.add_argument(
+            "--file",
+            help="File to write to instead of stdout",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Number of rows fetched from the database at a time",
+        )
+
+    def handle(self, *args, **options):
+        if options["kind"] == "flights":
+            rows = flight_export_rows(
+                Flight.objects.all(), options["chunk_size"]
+            )
+            columns = FLIGHT_COLUMNS
+        else:
+            if not options["user"]:
+                raise CommandError("--user is required to export orders.")
+            try:
+                user = get_user_model().objects.get(email=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}.")
+            rows = order_export_rows(user, options["chunk_size"])
+            columns = ORDER_COLUMNS
+
+        lines = encode_rows(rows, columns, options["output"])
+        if options["file"]:
+            with open(options["file"], "w", newline="") as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from airport.schedule_import import import_schedule, read_schedule
+
+
+class Command(BaseCommand):
+    """Django command to import a flight schedule from a CSV/JSON file."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .json schedule")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "json"),
+            help="File format, taken from the file extension by default",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+
+        try:
+            rows = read_schedule(path.read_bytes(), file_format)
+            flights = import_schedule(rows)
+        except OSError as error:
+            raise CommandError(f"Cannot read {path}: {error}")
+        except ValidationError as error:
+            self.stderr.write(json.dumps(error.detail, indent=2))
+            raise CommandError("The schedule was not imported.")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {len(flights)} flight(s).")
+        )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.order_queue import process_order_queue
+
+
+class Command(BaseCommand):
+    """Django command to book orders from the asynchronous queue."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Maximum number of orders booked per commit",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when empty",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls of an empty queue",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = process_order_queue(options["batch_size"])
+            if count or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Processed {count} queued order(s).")
+                )
+            if not options["loop"]:
+                return
+            if not count:
+                time.sleep(options["sleep"])
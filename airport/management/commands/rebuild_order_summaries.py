@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from airport.order_summaries import rebuild_order_summaries
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the order summary read model."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only build summaries of orders that have none",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of orders serialized per batch",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_order_summaries(
+            missing_only=options["missing_only"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {count} order summary(ies).")
+        )
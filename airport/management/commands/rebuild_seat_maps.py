@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    """Django command to rebuild flight seat maps from sold tickets."""
+
+    def handle(self, *args, **options):
+        flights = Flight.objects.select_related("airplane")
+        count = 0
+        for flight in flights.iterator():
+            flight.rebuild_seat_map()
+            count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt seat maps of {count} flight(s).")
+        )
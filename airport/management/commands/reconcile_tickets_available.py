@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    """Django command to recount available tickets of all flights."""
+
+    def handle(self, *args, **options):
+        count = Flight.reconcile_tickets_available()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled available tickets of {count} flight(s)."
+            )
+        )
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.schema import schema_cache, write_schema_file
+
+
+class Command(BaseCommand):
+    """Django command to regenerate the served OpenAPI schema file."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=settings.SCHEMA_FILE,
+            help="Schema file to write, settings.SCHEMA_FILE by default",
+        )
+
+    def handle(self, *args, **options):
+        if not options["file"]:
+            raise CommandError("Set SCHEMA_FILE or pass --file.")
+        schema = write_schema_file(options["file"])
+        schema_cache.clear()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote the schema ({len(schema['paths'])} paths) "
+                f"to {options['file']}."
+            )
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from airport.seat_holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    """Django command to delete expired seat holds."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of holds deleted per query",
+        )
+
+    def handle(self, *args, **options):
+        count = sweep_expired_holds(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {count} expired seat hold(s).")
+        )
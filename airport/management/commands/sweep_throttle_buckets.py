@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from airport.throttling import sweep_full_buckets
+
+
+class Command(BaseCommand):
+    """Django command to delete refilled throttle buckets."""
+
+    def handle(self, *args, **options):
+        count = sweep_full_buckets()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {count} full throttle bucket(s).")
+        )
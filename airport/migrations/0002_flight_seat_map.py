@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+def build_seat_maps(apps, schema_editor):
+    """Pack the sold seats of every flight into its seat map.
+
+    The layout is spelled out here rather than taken from
+    airport.seat_map, so this migration keeps working if that module
+    changes: one bit per seat, row-major, most significant bit first.
+    """
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    flights = Flight.objects.select_related("airplane").filter(
+        tickets__isnull=False
+    ).distinct()
+    for flight in flights.iterator():
+        rows = flight.airplane.rows
+        seats_in_row = flight.airplane.seats_in_row
+        bits = bytearray((rows * seats_in_row + 7) // 8)
+        for row, seat in Ticket.objects.filter(flight=flight).values_list(
+            "row", "seat"
+        ):
+            if 1 <= row <= rows and 1 <= seat <= seats_in_row:
+                index = (row - 1) * seats_in_row + (seat - 1)
+                bits[index // 8] |= 0x80 >> (index % 8)
+        flight.seat_map = bytes(bits)
+        flight.save(update_fields=["seat_map"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='seat_map',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(build_seat_maps, migrations.RunPython.noop),
+    ]
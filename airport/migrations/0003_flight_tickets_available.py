@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:02
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tickets_available(apps, schema_editor):
+    Airplane = apps.get_model("airport", "Airplane")
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    capacity = Airplane.objects.filter(
+        pk=OuterRef("airplane_id")
+    ).values(capacity=F("rows") * F("seats_in_row"))
+    sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(sold=Count("id"))
+        .values("sold")
+    )
+    Flight.objects.update(
+        tickets_available=Subquery(capacity) - Coalesce(Subquery(sold), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0002_flight_seat_map'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='tickets_available',
+            field=models.IntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            count_tickets_available, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:45
+
+import airport.models
+import django.contrib.postgres.constraints
+from django.core.management.base import CommandError
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef, Q
+
+MAX_REPORTED_FLIGHTS = 20
+
+
+def check_flight_schedules(apps, schema_editor):
+    """Refuse to add the constraints while existing flights break them.
+
+    Flights are listed rather than changed, since they may have tickets;
+    fix their times or airplanes (ex. in the admin) and migrate again.
+    """
+    Flight = apps.get_model("airport", "Flight")
+
+    overlapping = Flight.objects.filter(
+        ~Q(pk=OuterRef("pk")),
+        airplane_id=OuterRef("airplane_id"),
+        departure_time__lt=OuterRef("arrival_time"),
+        arrival_time__gt=OuterRef("departure_time"),
+    )
+    conflicts = {
+        "arrive before they depart": Flight.objects.filter(
+            arrival_time__lte=F("departure_time")
+        ),
+        "overlap another flight of their airplane": Flight.objects.filter(
+            Exists(overlapping), departure_time__lt=F("arrival_time")
+        ),
+    }
+    problems = []
+    for problem, flights in conflicts.items():
+        ids = list(
+            flights.order_by("id").values_list("id", flat=True)[
+                : MAX_REPORTED_FLIGHTS + 1
+            ]
+        )
+        if ids:
+            listed = ", ".join(map(str, ids[:MAX_REPORTED_FLIGHTS]))
+            if len(ids) > MAX_REPORTED_FLIGHTS:
+                listed += ", ..."
+            problems.append(f"flights that {problem}: {listed}")
+    if problems:
+        raise CommandError(
+            "Cannot add the flight schedule constraints; fix these flights "
+            "first. " + "; ".join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0005_flight_route_departure_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_flight_schedules, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='flight',
+            constraint=models.CheckConstraint(condition=models.Q(('departure_time__lt', models.F('arrival_time'))), name='flight_departure_before_arrival'),
+        ),
+        migrations.AddConstraint(
+            model_name='flight',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[(airport.models.Int8Range('airplane', 'airplane', models.Value('[]')), '='), (airport.models.TsTzRange('departure_time', 'arrival_time'), '&&')], name='flight_airplane_no_overlap'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0009_ordersummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('full_at', models.FloatField(db_index=True)),
+            ],
+        ),
+        migrations.RunSQL(
+            "ALTER TABLE airport_throttlebucket SET UNLOGGED",
+            "ALTER TABLE airport_throttlebucket SET LOGGED",
+        ),
+    ]
@@ -1,9 +1,23 @@
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    BigIntegerRangeField,
+    DateTimeRangeField,
+    RangeOperators,
+)
+from django.core import exceptions
+from django.db import models, transaction
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from rest_framework.exceptions import ValidationError
+import uuid
 from datetime import timedelta
 
 from django.conf import settings
 
+from airport.query_planning import depends_on
+from airport.seat_map import SeatMap
+from airport.versions import bump_object_version, bump_version
+
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=255)
@@ -13,7 +27,7 @@ class Crew(models.Model):
         return self.first_name + " " + self.last_name
 
     @property
-    def full_name(self):
+    def full_name(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
 
@@ -37,6 +51,19 @@ class Airplane(models.Model):
     def capacity(self) -> int:
         return self.rows * self.seats_in_row
 
+    def clean(self):
+        if self.pk is None:
+            return
+        stranded = Ticket.objects.filter(
+            Q(row__gt=self.rows) | Q(seat__gt=self.seats_in_row),
+            flight__airplane=self,
+        )
+        if stranded.exists():
+            raise exceptions.ValidationError(
+                "Tickets are sold for seats outside of this layout; "
+                "move them before removing rows or seats."
+            )
+
     def __str__(self):
         return self.name
 
@@ -62,6 +89,7 @@ class Route(models.Model):
     distance = models.IntegerField()
 
     @property
+    @depends_on("source", "destination")
     def full_route(self) -> str:
         return f"{self.source.name} - {self.destination.name}"
 
@@ -94,6 +122,53 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="order_user_created_idx",
+            ),
+        ]
+
+
+class OrderSummary(models.Model):
+    """Serialized list and detail representation of an order.
+
+    Written when an order is booked and deleted whenever a ticket,
+    flight, route, airport, airplane or crew member it shows changes;
+    missing summaries are rebuilt on read.
+    """
+
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary"
+    )
+    list_data = models.JSONField()
+    detail_data = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary of order {self.order_id}"
+
+    @classmethod
+    def invalidate(cls, *args, **filters):
+        """Delete matching summaries now and once more after commit"""
+        def delete():
+            cls.objects.filter(*args, **filters).delete()
+
+        delete()
+        transaction.on_commit(delete)
+
+
+class Int8Range(Func):
+    function = "INT8RANGE"
+    output_field = BigIntegerRangeField()
+
+
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
 
 
 class Flight(models.Model):
@@ -102,13 +177,110 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    seat_map = models.BinaryField(default=bytes, editable=False)
+    tickets_available = models.IntegerField(editable=False)
 
     class Meta:
         ordering = ["departure_time"]
+        indexes = [
+            models.Index(
+                fields=["departure_time", "arrival_time", "id"],
+                name="flight_schedule_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(departure_time__lt=F("arrival_time")),
+                name="flight_departure_before_arrival",
+            ),
+            # A single-value range compares airplanes with the built-in
+            # GiST range operator class, so btree_gist is not required.
+            ExclusionConstraint(
+                name="flight_airplane_no_overlap",
+                expressions=[
+                    (
+                        Int8Range("airplane", "airplane", Value("[]")),
+                        RangeOperators.EQUAL,
+                    ),
+                    (
+                        TsTzRange("departure_time", "arrival_time"),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.route.destination} - {self.departure_time}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.tickets_available is None:
+            self.tickets_available = (
+                self.airplane.capacity - self.get_seat_map().taken_count
+            )
+        super().save(*args, **kwargs)
+
+    def get_seat_map(self) -> SeatMap:
+        return SeatMap.for_airplane(self.airplane, self.seat_map)
+
+    def _store_seat_map(self, seat_map):
+        self.seat_map = seat_map.to_bytes()
+        self.tickets_available = (
+            self.airplane.capacity - seat_map.taken_count
+        )
+        self.save(update_fields=["seat_map", "tickets_available"])
+
+    @classmethod
+    def update_seat_map(cls, flight_id, taken=(), released=()):
+        """Mark seats as taken or released under a lock on the flight row"""
+        with transaction.atomic():
+            flight = (
+                cls.objects.select_for_update(of=("self",))
+                .select_related("airplane")
+                .filter(pk=flight_id)
+                .first()
+            )
+            if flight is None:
+                return
+            seat_map = flight.get_seat_map()
+            for row, seat in released:
+                seat_map.release(row, seat)
+            for row, seat in taken:
+                seat_map.take(row, seat)
+            flight._store_seat_map(seat_map)
+
+    def rebuild_seat_map(self):
+        seat_map = SeatMap.for_airplane(self.airplane)
+        for row, seat in self.tickets.values_list("row", "seat"):
+            seat_map.take(row, seat)
+        self._store_seat_map(seat_map)
+
+    @classmethod
+    def reconcile_tickets_available(cls, queryset=None):
+        """Recompute tickets_available from tickets in a single UPDATE"""
+        if queryset is None:
+            queryset = cls.objects.all()
+        capacity = Airplane.objects.filter(
+            pk=OuterRef("airplane_id")
+        ).values(capacity=F("rows") * F("seats_in_row"))
+        sold = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(sold=Count("id"))
+            .values("sold")
+        )
+        updated = queryset.update(
+            tickets_available=Subquery(capacity) - Coalesce(Subquery(sold), 0)
+        )
+        bump_version("flight")
+        bump_object_version("flight")
+        return updated
+
     @staticmethod
     def validate_flight_departure_location(
         source, previous_destination, available_route_list, error_to_raise
@@ -130,6 +302,42 @@ class Flight(models.Model):
                     "then schedule the flight."
                 )
 
+    @staticmethod
+    def validate_schedule_constraints(
+        integrity_error,
+        airplane,
+        departure_time,
+        arrival_time,
+        error_to_raise
+    ):
+        """Turn a schedule constraint violation into the usual messages"""
+        constraint_name = getattr(
+            getattr(integrity_error.__cause__, "diag", None),
+            "constraint_name",
+            None,
+        )
+        if constraint_name == "flight_departure_before_arrival":
+            Flight.validate_flight_time(
+                departure_time, arrival_time, None, error_to_raise
+            )
+        if constraint_name == "flight_airplane_no_overlap":
+            overlapping_flight = (
+                Flight.objects.filter(
+                    airplane=airplane,
+                    departure_time__lt=arrival_time,
+                    arrival_time__gt=departure_time,
+                )
+                .order_by("-arrival_time")
+                .first()
+            )
+            if overlapping_flight:
+                Flight.validate_flight_time(
+                    departure_time,
+                    arrival_time,
+                    overlapping_flight.arrival_time,
+                    error_to_raise,
+                )
+
     @staticmethod
     def validate_flight_time(
         departure_time, arrival_time, previous_arrival_time, error_to_raise
@@ -246,3 +454,96 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("flight", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class SeatHold(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return (
+            f"{str(self.flight)} (row: {self.row}, seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+    class Meta:
+        unique_together = ("flight", "row", "seat")
+        ordering = ["row", "seat"]
+
+
+class OrderRequest(models.Model):
+    """Order waiting in the asynchronous booking queue"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        COMPLETED = "completed"
+        FAILED = "failed"
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_requests"
+    )
+    # Requests are batched by the lowest flight id of their tickets
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="order_requests"
+    )
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    errors = models.JSONField(null=True, blank=True)
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="request"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.token} ({self.status})"
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                condition=Q(status="pending"),
+                name="order_request_pending_idx",
+            ),
+        ]
+
+
+class ThrottleBucket(models.Model):
+    """Token bucket of a throttle key, shared by all workers.
+
+    The bucket is stored as the time it will be full again; every
+    request moves that time forward by one token's refill interval.
+    The table is unlogged: it is not crash safe and not replicated,
+    which only ever resets rate limits.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    full_at = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return self.key
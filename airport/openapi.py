@@ -0,0 +1,24 @@
+from drf_spectacular.openapi import AutoSchema as SpectacularAutoSchema
+
+from airport.sparse_fields import SparseFieldsMixin
+
+
+class AutoSchema(SpectacularAutoSchema):
+    """Default schema class, documenting the ``fields`` parameter of
+    sparse fieldset actions.
+
+    Referenced from REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] so that
+    drf_spectacular's inspector is only imported by profiles that
+    serve the schema.
+    """
+
+    def get_override_parameters(self):
+        parameters = super().get_override_parameters()
+        if (
+            self.method == "GET"
+            and isinstance(self.view, SparseFieldsMixin)
+            and getattr(self.view, "action", None)
+            in self.view.sparse_fields_actions
+        ):
+            parameters = [*parameters, SparseFieldsMixin.fields_parameter]
+        return parameters
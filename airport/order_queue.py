@@ -0,0 +1,87 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airport.models import OrderRequest
+from airport.order_summaries import build_order_summaries
+from airport.serializers import OrderSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_order(user, serializer):
+    """Queue an order whose payload passed OrderSerializer validation"""
+    tickets = serializer.validated_data["tickets"]
+    return OrderRequest.objects.create(
+        user=user,
+        flight_id=min(ticket["flight"].id for ticket in tickets),
+        payload=serializer.initial_data,
+    )
+
+
+def _book(order_request):
+    serializer = OrderSerializer(
+        data=order_request.payload,
+        context={"created_at": order_request.created_at},
+    )
+    try:
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            order_request.order = serializer.save(user=order_request.user)
+            order_request.status = OrderRequest.Status.COMPLETED
+    except ValidationError as error:
+        order_request.status = OrderRequest.Status.FAILED
+        order_request.errors = error.detail
+    except Exception:
+        # Only this request's savepoint is rolled back; the rest of the
+        # batch is still committed, so the request is not retried
+        logger.exception("Booking order request %s failed", order_request.pk)
+        order_request.status = OrderRequest.Status.FAILED
+        order_request.errors = {"detail": "The order could not be booked."}
+
+
+def process_order_batch(batch_size=100) -> int:
+    """Book up to ``batch_size`` queued orders of one flight.
+
+    The flight of the oldest pending request is taken and its pending
+    requests are booked in queue order, each in its own savepoint, and
+    committed together. Rows locked by another worker are skipped, so
+    several workers can drain the queue in parallel. Returns the number
+    of processed requests.
+    """
+    pending = OrderRequest.objects.select_for_update(
+        skip_locked=True, of=("self",)
+    ).filter(status=OrderRequest.Status.PENDING)
+    with transaction.atomic():
+        oldest = pending.order_by("created_at", "id").first()
+        if oldest is None:
+            return 0
+        order_requests = list(
+            pending.filter(flight_id=oldest.flight_id)
+            .select_related("user")
+            .order_by("created_at", "id")[:batch_size]
+        )
+        for order_request in order_requests:
+            _book(order_request)
+            order_request.processed_at = timezone.now()
+        OrderRequest.objects.bulk_update(
+            order_requests, ["status", "errors", "order", "processed_at"]
+        )
+        build_order_summaries(
+            [
+                order_request.order_id
+                for order_request in order_requests
+                if order_request.order_id
+            ]
+        )
+    return len(order_requests)
+
+
+def process_order_queue(batch_size=100) -> int:
+    """Process batches until the queue is empty"""
+    processed = 0
+    while count := process_order_batch(batch_size):
+        processed += count
+    return processed
@@ -0,0 +1,62 @@
+from airport.models import Order, OrderSummary
+from airport.query_planning import plan_serializer
+from airport.serializers import OrderDetailSerializer, OrderListSerializer
+
+
+def build_order_summaries(order_ids) -> dict:
+    """Serialize orders once and upsert their summaries"""
+    plan = plan_serializer(OrderListSerializer())
+    plan_serializer(OrderDetailSerializer(), plan)
+    orders = plan.apply(Order.objects.filter(id__in=order_ids))
+    summaries = [
+        OrderSummary(
+            order=order,
+            list_data=OrderListSerializer(order).data,
+            detail_data=OrderDetailSerializer(order).data,
+        )
+        for order in orders
+    ]
+    OrderSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["order"],
+        update_fields=["list_data", "detail_data", "updated_at"],
+    )
+    return {summary.order_id: summary for summary in summaries}
+
+
+def get_order_summaries(orders) -> dict:
+    """Summaries of orders loaded with select_related("summary").
+
+    Missing ones (never built or invalidated since) are rebuilt in one
+    batch.
+    """
+    summaries = {}
+    missing = []
+    for order in orders:
+        try:
+            summaries[order.id] = order.summary
+        except OrderSummary.DoesNotExist:
+            missing.append(order.id)
+    if missing:
+        summaries.update(build_order_summaries(missing))
+    return summaries
+
+
+def rebuild_order_summaries(missing_only=False, batch_size=500) -> int:
+    """Rebuild summaries of all orders, or only of those without one"""
+    orders = Order.objects.order_by("id")
+    if missing_only:
+        orders = orders.filter(summary__isnull=True)
+    order_ids = orders.values_list("id", flat=True)
+
+    count = 0
+    batch = []
+    for order_id in order_ids.iterator(chunk_size=batch_size):
+        batch.append(order_id)
+        if len(batch) == batch_size:
+            count += len(build_order_summaries(batch))
+            batch = []
+    if batch:
+        count += len(build_order_summaries(batch))
+    return count
@@ -0,0 +1,190 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 5
+    max_page_size = 100
+
+
+class Row(Func):
+    function = "ROW"
+    output_field = models.Field()
+
+
+class KeysetCursorPagination(CursorPagination):
+    """CursorPagination seeking on every ordering field.
+
+    The cursor holds the ordering values of the row a page stops at, and
+    the next page starts after them with a row comparison, ex.
+    ``(departure_time, arrival_time, id) > (...)``, which an index on
+    those columns serves directly. Rows sharing the leading values are
+    never skipped by OFFSET, so writes between requests don't shift
+    pages. The ordering must end with a unique field and use a single
+    direction.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        assert len({field.startswith("-") for field in ordering}) == 1, (
+            "Keyset pagination needs every ordering field in the same "
+            "direction."
+        )
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_seek_lookup(queryset.model, ordering, position)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_seek_lookup(self, model, ordering, position):
+        """Rows after ``position`` in ``ordering``"""
+        names = [field.lstrip("-") for field in ordering]
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(names, position, strict=True)
+            ]
+        except (ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        lookup = LessThan if ordering[0].startswith("-") else GreaterThan
+        return lookup(
+            Row(*[F(name) for name in names]),
+            Row(*[Value(value) for value in values]),
+        )
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(offset=0, position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip("-") for field in ordering]
+        if isinstance(instance, dict):
+            return [instance[name] for name in names]
+        return [getattr(instance, name) for name in names]
+
+    def _link(self, instance, reverse):
+        position = (
+            self._get_position_from_instance(instance, self.ordering)
+            if instance is not None
+            else self.cursor.position
+        )
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=reverse,
+                # str() keeps the microseconds of datetimes
+                position=json.dumps(position, default=str),
+            )
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.page[-1] if self.page else None, False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(self.page[0] if self.page else None, True)
+
+
+class FlightCursorPagination(KeysetCursorPagination):
+    """Cursor pages of flights in schedule order, served by the
+    flight_schedule_idx index"""
+
+    page_size = 5
+    ordering = ("departure_time", "arrival_time", "id")
+
+
+class OrderCursorPagination(KeysetCursorPagination):
+    """Cursor pages of a user's orders, newest first, served by the
+    order_user_created_idx index"""
+
+    page_size = 5
+    ordering = ("-created_at", "-id")
+
+
+class CursorPaginationMixin:
+    """Let clients switch a viewset to cursor pagination.
+
+    Page number pagination stays the default; ``?pagination=cursor``
+    (or following a ``next``/``previous`` link that carries a cursor)
+    selects ``cursor_pagination_class`` instead.
+    """
+
+    cursor_pagination_class = None
+    pagination_parameter = OpenApiParameter(
+        name="pagination",
+        description="Use 'cursor' for cursor pagination "
+                    "with opaque next/previous links",
+        required=False,
+        type=str,
+        enum=["page", "cursor"],
+    )
+
+    def uses_cursor_pagination(self):
+        request = getattr(self, "request", None)
+        if self.cursor_pagination_class is None or request is None:
+            return False
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        return (
+            request.query_params.get("pagination") == "cursor"
+            or cursor_param in request.query_params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self.uses_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
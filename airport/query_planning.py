@@ -0,0 +1,151 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def depends_on(*paths):
+    """Declare the relations a model property or serializer method reads.
+
+    Paths are relation lookups from the instance, ex. "route__source".
+    Apply it under @property:
+
+        @property
+        @depends_on("source", "destination")
+        def full_route(self): ...
+    """
+
+    def decorator(func):
+        func.query_dependencies = paths
+        return func
+
+    return decorator
+
+
+def _dependencies(attribute):
+    func = getattr(attribute, "fget", None) or attribute
+    return getattr(func, "query_dependencies", ())
+
+
+class QueryPlan:
+    """Relations to load with a queryset of ``model``.
+
+    ``select`` and ``prefetch`` map relation names to the plans of the
+    related models, so relations of prefetched objects are joined or
+    prefetched in the prefetch query.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select = {}
+        self.prefetch = {}
+
+    def add(self, attrs):
+        """Plan the relations read by following attribute names.
+
+        Returns the plan of the model the path ends on, or None if it
+        ends on a column or a property.
+        """
+        if not attrs:
+            return self
+        name, rest = attrs[0], attrs[1:]
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            for path in _dependencies(getattr(self.model, name, None)):
+                self.add(path.split("__"))
+            return None
+        if not field.is_relation:
+            return None
+
+        relations = (
+            self.prefetch
+            if field.many_to_many or field.one_to_many
+            else self.select
+        )
+        if name not in relations:
+            relations[name] = QueryPlan(field.related_model)
+        return relations[name].add(rest)
+
+    def select_paths(self, prefix=""):
+        for name, plan in self.select.items():
+            yield f"{prefix}{name}"
+            yield from plan.select_paths(f"{prefix}{name}__")
+
+    def prefetch_lookups(self, prefix=""):
+        for name, plan in self.select.items():
+            yield from plan.prefetch_lookups(f"{prefix}{name}__")
+        for name, plan in self.prefetch.items():
+            if plan.select or plan.prefetch:
+                yield Prefetch(
+                    f"{prefix}{name}",
+                    queryset=plan.apply(plan.model._default_manager.all()),
+                )
+            else:
+                yield f"{prefix}{name}"
+
+    def apply(self, queryset):
+        select = list(self.select_paths())
+        if select:
+            queryset = queryset.select_related(*select)
+        prefetch = list(self.prefetch_lookups())
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+def _plan_field(field, plan):
+    if isinstance(field, serializers.SerializerMethodField):
+        method = getattr(field.parent, field.method_name)
+        for path in _dependencies(method):
+            plan.add(path.split("__"))
+        return
+
+    attrs = field.source_attrs
+    if isinstance(field, serializers.ManyRelatedField):
+        field = field.child_relation
+    elif isinstance(field, serializers.PrimaryKeyRelatedField):
+        # Served from the foreign key column of the parent row
+        plan.add(attrs[:-1])
+        return
+
+    target = plan.add(attrs)
+    if target is None:
+        return
+    if isinstance(field, serializers.SlugRelatedField):
+        target.add(field.slug_field.split("__"))
+    elif isinstance(field, serializers.BaseSerializer):
+        plan_serializer(field, target)
+
+
+def plan_serializer(serializer, plan=None) -> QueryPlan:
+    """Derive the relations a model serializer reads from its fields.
+
+    Field sources, slug fields and nested serializers are followed
+    through the model relations; properties and SerializerMethodField
+    methods contribute the paths declared with @depends_on. Pass
+    ``plan`` to merge the needs of several serializers.
+    """
+    serializer = getattr(serializer, "child", serializer)
+    if plan is None:
+        plan = QueryPlan(serializer.Meta.model)
+    for field in serializer.fields.values():
+        if not field.write_only:
+            _plan_field(field, plan)
+    return plan
+
+
+class QueryPlanningMixin:
+    """Load what the serializer reads with the list/retrieve queryset.
+
+    select_related and prefetch_related are derived from the serializer
+    of the action by plan_serializer, so querysets don't list them and
+    sparse fieldsets only load the relations of the requested fields.
+    """
+
+    query_planning_actions = ("list", "retrieve")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, "action", None) in self.query_planning_actions:
+            queryset = plan_serializer(self.get_serializer()).apply(queryset)
+        return queryset
@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from airport.versions import RequestVersionsMixin
+
+
+class ResponseCache:
+    """Process-local LRU cache of serialized response data"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, data):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+response_cache = ResponseCache(
+    getattr(settings, "RESPONSE_CACHE_MAX_ENTRIES", 1024)
+)
+
+
+class CachedResponseMixin(RequestVersionsMixin):
+    """Cache list and retrieve responses of a viewset.
+
+    Keys are built from the action, the normalized query parameters and
+    the version counters named in ``cache_versions``. Writes bump those
+    counters, so stale entries are never served and simply age out of
+    the LRU; nothing depends on a TTL.
+    """
+
+    cache_versions = ()
+
+    def get_request_version_names(self):
+        names = super().get_request_version_names()
+        if getattr(self, "action", None) in ("list", "retrieve"):
+            names = (*names, *self.cache_versions)
+        return names
+
+    def get_response_cache_key(self, request, kwargs):
+        query = tuple(
+            sorted(
+                (name, tuple(values))
+                for name, values in request.query_params.lists()
+                if any(values)
+            )
+        )
+        return (
+            type(self).__name__,
+            self.action,
+            tuple(sorted(kwargs.items())),
+            request.get_host(),
+            query,
+            self.request_versions(*self.cache_versions),
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request, kwargs)
+        data = response_cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """cached_response for the coroutine handlers of async views"""
+        key = self.get_response_cache_key(request, kwargs)
+        data = response_cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
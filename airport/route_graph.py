@@ -0,0 +1,94 @@
+import threading
+from collections import defaultdict, deque, namedtuple
+
+from asgiref.sync import sync_to_async
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+from airport.models import Route
+from airport.versions import aget_versions, get_versions
+
+RouteInfo = namedtuple(
+    "RouteInfo",
+    ["id", "source_id", "destination_id", "distance", "full_route"],
+)
+
+
+class RouteGraph:
+    """Adjacency index of the route network keyed by airport id"""
+
+    def __init__(self, routes):
+        self.routes = {}
+        self._outgoing = defaultdict(list)
+        self._incoming = defaultdict(list)
+        for route in sorted(routes, key=lambda route: route.id):
+            self.routes[route.id] = route
+            self._outgoing[route.source_id].append(route)
+            self._incoming[route.destination_id].append(route)
+
+    @classmethod
+    def from_database(cls):
+        return cls(
+            RouteInfo(*row)
+            for row in Route.objects.values_list(
+                "id",
+                "source_id",
+                "destination_id",
+                "distance",
+                Concat("source__name", Value(" - "), "destination__name"),
+            )
+        )
+
+    def all_routes(self):
+        return list(self.routes.values())
+
+    def routes_from(self, airport_id):
+        return list(self._outgoing.get(airport_id, ()))
+
+    def routes_to(self, airport_id):
+        return list(self._incoming.get(airport_id, ()))
+
+    def legs_to(self, destination_id, max_legs):
+        """Map airports to the fewest flights needed to reach destination"""
+        legs = {destination_id: 0}
+        queue = deque([destination_id])
+        while queue:
+            airport_id = queue.popleft()
+            if legs[airport_id] == max_legs:
+                continue
+            for route in self._incoming.get(airport_id, ()):
+                if route.source_id not in legs:
+                    legs[route.source_id] = legs[airport_id] + 1
+                    queue.append(route.source_id)
+        return legs
+
+
+_graph = None
+_graph_version = None
+_graph_lock = threading.Lock()
+
+
+def get_route_graph() -> RouteGraph:
+    """Return the process-wide route graph, rebuilding it after changes.
+
+    The graph is built on first use and rebuilt whenever a Route or
+    Airport write has bumped their version counters.
+    """
+    global _graph, _graph_version
+
+    version = get_versions("route", "airport")
+    if _graph is None or _graph_version != version:
+        with _graph_lock:
+            if _graph is None or _graph_version != version:
+                _graph = RouteGraph.from_database()
+                _graph_version = version
+    return _graph
+
+
+async def aget_route_graph() -> RouteGraph:
+    """get_route_graph for async views; only a rebuild leaves the loop"""
+    if _graph is not None and _graph_version == await aget_versions(
+        "route", "airport"
+    ):
+        return _graph
+    return await sync_to_async(get_route_graph)()
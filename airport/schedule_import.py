@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from airport.models import Airplane, Crew, Flight, Route
+from airport.route_graph import get_route_graph
+from airport.versions import bump_version
+
+
+class FlightImportSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    airplane = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    crew = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
+
+def read_schedule(content, file_format):
+    """Parse a CSV or JSON schedule into a list of row dicts.
+
+    CSV files need a header with route, airplane, departure_time,
+    arrival_time and an optional crew column of ``;``-separated ids.
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValidationError({"file": "The file must be UTF-8 encoded."})
+
+    if file_format == "json":
+        try:
+            rows = json.loads(content)
+        except ValueError as error:
+            raise ValidationError({"file": f"Invalid JSON: {error}"})
+        if isinstance(rows, dict):
+            rows = rows.get("flights")
+        if not isinstance(rows, list):
+            raise ValidationError(
+                {"file": "Expected a list of flights."}
+            )
+        return rows
+
+    if file_format == "csv":
+        rows = []
+        try:
+            for row in csv.DictReader(io.StringIO(content)):
+                crew = (row.get("crew") or "").replace(";", " ").split()
+                rows.append({**row, "crew": crew})
+        except csv.Error as error:
+            raise ValidationError({"file": f"Invalid CSV: {error}"})
+        return rows
+
+    raise ValidationError({"format": "Supported formats are csv and json."})
+
+
+def _previous_flights(airplane_ids):
+    """Latest scheduled flight of every airplane, in one query"""
+    return {
+        flight.airplane_id: flight
+        for flight in Flight.objects.filter(airplane_id__in=airplane_ids)
+        .select_related("route")
+        .order_by("airplane_id", "-arrival_time")
+        .distinct("airplane_id")
+    }
+
+
+def _available_route_list(route_graph, airport_id):
+    routes = route_graph.routes_from(airport_id)
+    if routes:
+        return ", ".join([route.full_route for route in routes])
+    return None
+
+
+def validate_schedule(rows):
+    """Check a whole schedule and report every violation at once.
+
+    Flights are grouped per airplane and sorted by departure, then each
+    one is checked against the previous flight of the same airplane
+    (already scheduled or earlier in the file) with the rules used by
+    FlightSerializer. Returns ``(flights, crew_ids)`` ready for insert;
+    raises ValidationError with one error dict per row otherwise.
+    """
+    parsed_rows = []
+    errors = []
+    for row in rows:
+        parser = FlightImportSerializer(data=row)
+        is_valid = parser.is_valid()
+        parsed_rows.append(parser.validated_data if is_valid else None)
+        errors.append(defaultdict(list, parser.errors))
+    rows = parsed_rows
+    valid_rows = [row for row in rows if row is not None]
+
+    routes = Route.objects.in_bulk({row["route"] for row in valid_rows})
+    airplanes = Airplane.objects.in_bulk(
+        {row["airplane"] for row in valid_rows}
+    )
+    crew = Crew.objects.in_bulk(
+        {crew_id for row in valid_rows for crew_id in row["crew"]}
+    )
+    for index, row in enumerate(rows):
+        if row is None:
+            continue
+        if row["route"] not in routes:
+            errors[index]["route"].append(
+                f"Route {row['route']} does not exist."
+            )
+        if row["airplane"] not in airplanes:
+            errors[index]["airplane"].append(
+                f"Airplane {row['airplane']} does not exist."
+            )
+        missing_crew = [
+            crew_id for crew_id in row["crew"] if crew_id not in crew
+        ]
+        if missing_crew:
+            errors[index]["crew"].append(
+                f"Crew members {missing_crew} do not exist."
+            )
+
+    rows_by_airplane = defaultdict(list)
+    for index, row in enumerate(rows):
+        if not errors[index]:
+            rows_by_airplane[row["airplane"]].append(index)
+
+    route_graph = get_route_graph()
+    previous_flights = _previous_flights(rows_by_airplane)
+
+    for airplane_id, indexes in rows_by_airplane.items():
+        indexes.sort(key=lambda index: rows[index]["departure_time"])
+        previous = previous_flights.get(airplane_id)
+        previous_arrival_time = previous.arrival_time if previous else None
+        previous_destination_id = (
+            previous.route.destination_id if previous else None
+        )
+
+        for index in indexes:
+            row = rows[index]
+            route = routes[row["route"]]
+            try:
+                if previous_arrival_time:
+                    Flight.validate_flight_departure_location(
+                        route.source_id,
+                        previous_destination_id,
+                        _available_route_list(
+                            route_graph, previous_destination_id
+                        ),
+                        ValidationError,
+                    )
+                Flight.validate_flight_time(
+                    row["departure_time"],
+                    row["arrival_time"],
+                    previous_arrival_time,
+                    ValidationError,
+                )
+            except ValidationError as error:
+                errors[index]["non_field_errors"].extend(error.detail)
+            previous_arrival_time = row["arrival_time"]
+            previous_destination_id = route.destination_id
+
+    if any(errors):
+        raise ValidationError([dict(row_errors) for row_errors in errors])
+
+    flights = [
+        Flight(
+            route=routes[row["route"]],
+            airplane=airplanes[row["airplane"]],
+            departure_time=row["departure_time"],
+            arrival_time=row["arrival_time"],
+            tickets_available=airplanes[row["airplane"]].capacity,
+        )
+        for row in rows
+    ]
+    return flights, [row["crew"] for row in rows]
+
+
+def _schedule_conflicts(integrity_error, flights):
+    """Per-row errors for flights rejected by the schedule constraints"""
+    errors = []
+    for flight in flights:
+        try:
+            Flight.validate_schedule_constraints(
+                integrity_error,
+                flight.airplane,
+                flight.departure_time,
+                flight.arrival_time,
+                ValidationError,
+            )
+        except ValidationError as error:
+            errors.append({"non_field_errors": error.detail})
+        else:
+            errors.append({})
+    return errors
+
+
+def import_schedule(rows) -> list:
+    """Validate a schedule and insert it with bulk_create"""
+    with transaction.atomic():
+        flights, crew_ids = validate_schedule(rows)
+        try:
+            with transaction.atomic():
+                Flight.objects.bulk_create(flights)
+        except IntegrityError as error:
+            errors = _schedule_conflicts(error, flights)
+            if not any(errors):
+                raise
+            raise ValidationError(errors)
+        Flight.crew.through.objects.bulk_create(
+            [
+                Flight.crew.through(flight_id=flight.id, crew_id=crew_id)
+                for flight, flight_crew_ids in zip(flights, crew_ids)
+                for crew_id in dict.fromkeys(flight_crew_ids)
+            ]
+        )
+        bump_version("flight")
+    return flights
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+def generate_schema() -> dict:
+    """The public OpenAPI schema, as SpectacularAPIView would serve it"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema_file(path) -> dict:
+    """Generate the schema and atomically replace ``path`` with it"""
+    schema = generate_schema()
+    path = Path(path)
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    temporary_path.write_text(json.dumps(schema))
+    os.replace(temporary_path, path)
+    return schema
+
+
+class SchemaCache:
+    """Process-wide OpenAPI schema and its rendered documents.
+
+    The schema is read from settings.SCHEMA_FILE when it exists and
+    otherwise generated on first use. A newer file (written by the
+    regenerate_schema command) replaces it without a restart. Each
+    renderer's output is kept with a strong ETag.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schema = None
+        self._file_mtime = None
+        self._documents = {}
+
+    def _schema_file_mtime(self):
+        path = getattr(settings, "SCHEMA_FILE", None)
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except FileNotFoundError:
+            return None
+
+    def get_schema(self) -> dict:
+        mtime = self._schema_file_mtime()
+        with self._lock:
+            if self._schema is None or mtime != self._file_mtime:
+                if mtime is None:
+                    self._schema = generate_schema()
+                else:
+                    self._schema = json.loads(
+                        Path(settings.SCHEMA_FILE).read_text()
+                    )
+                self._file_mtime = mtime
+                self._documents.clear()
+            return self._schema
+
+    def get_document(self, renderer, media_type):
+        """Rendered schema and its ETag for a negotiated renderer"""
+        schema = self.get_schema()
+        with self._lock:
+            if media_type not in self._documents:
+                content = renderer.render(schema, media_type)
+                digest = hashlib.blake2b(content, digest_size=16)
+                self._documents[media_type] = (
+                    content, quote_etag(digest.hexdigest())
+                )
+            return self._documents[media_type]
+
+    def clear(self):
+        with self._lock:
+            self._schema = None
+            self._documents.clear()
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """SpectacularAPIView serving the schema from schema_cache.
+
+    Requests for a specific API version or language fall back to
+    generating the schema.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        version = self.api_version or request.version
+        if version or request.GET.get("version") or request.GET.get("lang"):
+            return super().get(request, *args, **kwargs)
+
+        media_type = request.accepted_media_type
+        content, etag = schema_cache.get_document(
+            request.accepted_renderer, media_type
+        )
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if "*" in etags or any(
+            tag.removeprefix("W/") == etag for tag in etags
+        ):
+            response = HttpResponse(status=304)
+        else:
+            charset = request.accepted_renderer.charset
+            response = HttpResponse(
+                content,
+                content_type=(
+                    f"{media_type}; charset={charset}"
+                    if charset
+                    else media_type
+                ),
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response["ETag"] = etag
+        return response
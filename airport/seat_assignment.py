@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airport.booking import active_holds, book_tickets, lock_flights
+from airport.models import Order, Ticket
+
+
+def _free_rows(seat_map, unavailable):
+    return [
+        [
+            seat
+            for seat in range(1, seat_map.seats_in_row + 1)
+            if not seat_map.is_taken(row, seat)
+            and (row, seat) not in unavailable
+        ]
+        for row in range(1, seat_map.rows + 1)
+    ]
+
+
+def _runs(seats):
+    """Split sorted seat numbers into runs of neighbouring seats"""
+    runs = []
+    for seat in seats:
+        if runs and runs[-1][-1] == seat - 1:
+            runs[-1].append(seat)
+        else:
+            runs.append([seat])
+    return runs
+
+
+def find_seats(seat_map, count, unavailable=()):
+    """Pick ``count`` free seats that sit as close together as possible.
+
+    Tries, in order: neighbouring seats in one row (the smallest gap
+    that fits, so larger gaps stay free for larger groups), any seats in
+    one row, then the fewest consecutive rows holding enough free seats.
+    Returns a list of (row, seat) or None if the flight has not enough
+    free seats.
+    """
+    free_rows = _free_rows(seat_map, set(unavailable))
+    if sum(len(seats) for seats in free_rows) < count:
+        return None
+
+    best_run = None
+    for row, seats in enumerate(free_rows, start=1):
+        for run in _runs(seats):
+            if count <= len(run) and (
+                best_run is None or len(run) < len(best_run[1])
+            ):
+                best_run = row, run
+    if best_run:
+        row, run = best_run
+        return [(row, seat) for seat in run[:count]]
+
+    for row, seats in enumerate(free_rows, start=1):
+        if count <= len(seats):
+            return [(row, seat) for seat in seats[:count]]
+
+    best_window = None
+    first = free_count = 0
+    for last, seats in enumerate(free_rows):
+        free_count += len(seats)
+        while free_count - len(free_rows[first]) >= count:
+            free_count -= len(free_rows[first])
+            first += 1
+        if free_count >= count and (
+            best_window is None
+            or last - first < best_window[1] - best_window[0]
+        ):
+            best_window = first, last
+
+    first, last = best_window
+    places = [
+        (row, seat)
+        for row in range(first + 1, last + 2)
+        for seat in free_rows[row - 1]
+    ]
+    return places[:count]
+
+
+def assign_seats(user, flight, count):
+    """Book ``count`` seats chosen by find_seats in a new order.
+
+    Seats are picked and booked under the flight row lock, so the
+    order either gets all of its seats or is not created at all.
+    """
+    with transaction.atomic():
+        flight = lock_flights({flight.id})[flight.id]
+        Ticket.validate_ticket_flight(
+            timezone.now(), flight.departure_time, ValidationError
+        )
+        held_by_others = {
+            (row, seat)
+            for (_, row, seat), user_id in active_holds({flight.id}).items()
+            if user_id != user.id
+        }
+        places = find_seats(flight.get_seat_map(), count, held_by_others)
+        if places is None:
+            raise ValidationError(
+                {"count": f"Not enough free seats on this flight for "
+                          f"{count} passenger(s)."}
+            )
+
+        order = Order.objects.create(user=user)
+        book_tickets(
+            order,
+            [
+                {"flight": flight, "row": row, "seat": seat}
+                for row, seat in places
+            ],
+        )
+        return order
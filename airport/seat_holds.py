@@ -0,0 +1,95 @@
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airport.booking import active_holds, lock_flights
+from airport.models import SeatHold, Ticket
+
+
+def sweep_expired_holds(now=None, batch_size=1000, **filters):
+    """Delete expired holds in batches, returning how many were removed"""
+    now = now or timezone.now()
+    expired = SeatHold.objects.filter(expires_at__lte=now, **filters)
+    deleted = 0
+    while True:
+        batch = list(expired.values_list("id", flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += SeatHold.objects.filter(id__in=batch).delete()[0]
+
+
+def hold_seats(user, flight, seats, ttl=None):
+    """Hold seats of a flight for ``user`` until the TTL runs out.
+
+    Seats the user already holds get a fresh expiry. Sold seats and
+    seats held by other users are reported per seat, in the order they
+    were given, and nothing is held in that case.
+    """
+    ttl = ttl or settings.SEAT_HOLD_TTL
+    with transaction.atomic():
+        flight = lock_flights({flight.id})[flight.id]
+        now = timezone.now()
+        sweep_expired_holds(now, flight=flight)
+
+        seat_map = flight.get_seat_map()
+        holds = active_holds({flight.id}, now)
+        requested = {}
+        errors = []
+        for row, seat in seats:
+            try:
+                Ticket.validate_ticket(
+                    row, seat, flight.airplane, ValidationError
+                )
+                holder_id = holds.get((flight.id, row, seat))
+                if seat_map.is_taken(row, seat) or (row, seat) in requested:
+                    raise ValidationError(
+                        {
+                            "seat": f"Seat (row: {row}, seat: {seat}) "
+                            f"is already taken on this flight."
+                        }
+                    )
+                if holder_id not in (None, user.id):
+                    raise ValidationError(
+                        {
+                            "seat": f"Seat (row: {row}, seat: {seat}) "
+                            f"is held by another customer."
+                        }
+                    )
+            except ValidationError as error:
+                errors.append(error.detail)
+                continue
+            requested[row, seat] = None
+            errors.append({})
+
+        if any(errors):
+            raise ValidationError({"seats": errors})
+
+        expires_at = now + ttl
+        held_seats = SeatHold.objects.filter(
+            reduce(
+                operator.or_,
+                [Q(row=row, seat=seat) for row, seat in requested],
+            ),
+            flight=flight,
+            user=user,
+        )
+        held_seats.update(expires_at=expires_at)
+        SeatHold.objects.bulk_create(
+            [
+                SeatHold(
+                    flight=flight,
+                    row=row,
+                    seat=seat,
+                    user=user,
+                    expires_at=expires_at,
+                )
+                for row, seat in requested
+                if (flight.id, row, seat) not in holds
+            ]
+        )
+        return list(held_seats)
@@ -0,0 +1,56 @@
+import base64
+
+
+class SeatMap:
+    """Bitset of taken seats of a flight.
+
+    Seats are stored row-major, one bit per seat: the seat (row, seat)
+    is bit number ``(row - 1) * seats_in_row + (seat - 1)``, and bits are
+    packed most significant bit first.
+    """
+
+    def __init__(self, rows, seats_in_row, data=b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self._bits = bytearray(bytes(data)[:size].ljust(size, b"\0"))
+
+    @classmethod
+    def for_airplane(cls, airplane, data=b""):
+        return cls(airplane.rows, airplane.seats_in_row, data)
+
+    def _position(self, row, seat):
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            raise IndexError(
+                f"Seat (row: {row}, seat: {seat}) is out of range"
+            )
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index // 8, 0x80 >> (index % 8)
+
+    def is_taken(self, row, seat) -> bool:
+        byte, mask = self._position(row, seat)
+        return bool(self._bits[byte] & mask)
+
+    def take(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] |= mask
+
+    def release(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] &= ~mask
+
+    @property
+    def taken_count(self) -> int:
+        return int.from_bytes(self._bits, "big").bit_count()
+
+    def taken_places(self):
+        for row in range(1, self.rows + 1):
+            for seat in range(1, self.seats_in_row + 1):
+                if self.is_taken(row, seat):
+                    yield row, seat
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
+
+    def encode(self) -> str:
+        return base64.b64encode(self._bits).decode("ascii")
@@ -1,18 +1,25 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from django.utils import timezone
 
+from airport.booking import book_tickets
 from airport.models import (
     AirplaneType,
+    SeatHold,
     Crew,
     Airplane,
     Airport,
     Route,
     Order,
+    OrderRequest,
     Ticket,
     Flight,
 )
+from airport.query_planning import depends_on
+from airport.route_graph import get_route_graph
+from airport.seat_holds import hold_seats
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -114,6 +121,7 @@ class FlightSerializer(serializers.ModelSerializer):
 
         previous_flight = (
             Flight.objects.filter(airplane=airplane)
+            .select_related("route")
             .order_by("-arrival_time")
             .first()
         )
@@ -122,8 +130,9 @@ class FlightSerializer(serializers.ModelSerializer):
         if previous_flight:
             previous_arrival_time = previous_flight.arrival_time
 
-            available_routes = Route.objects.filter(
-                source=previous_flight.route.destination
+            previous_destination_id = previous_flight.route.destination_id
+            available_routes = get_route_graph().routes_from(
+                previous_destination_id
             )
             available_route_list = None
             if available_routes:
@@ -132,8 +141,8 @@ class FlightSerializer(serializers.ModelSerializer):
                 )
 
             Flight.validate_flight_departure_location(
-                route.source,
-                previous_flight.route.destination,
+                route.source_id,
+                previous_destination_id,
                 available_route_list,
                 ValidationError,
             )
@@ -147,6 +156,20 @@ class FlightSerializer(serializers.ModelSerializer):
 
         return data
 
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as error:
+            Flight.validate_schedule_constraints(
+                error,
+                validated_data["airplane"],
+                validated_data["departure_time"],
+                validated_data["arrival_time"],
+                ValidationError,
+            )
+            raise
+
 
 class FlightListSerializer(FlightSerializer):
     route = serializers.SlugRelatedField(
@@ -161,7 +184,101 @@ class FlightListSerializer(FlightSerializer):
     )
 
 
+class ItinerarySearchSerializer(serializers.Serializer):
+    source = serializers.PrimaryKeyRelatedField(
+        queryset=Airport.objects.all(),
+        help_text="Departure airport id"
+    )
+    destination = serializers.PrimaryKeyRelatedField(
+        queryset=Airport.objects.all(),
+        help_text="Destination airport id"
+    )
+    date = serializers.DateField(
+        help_text="Departure date of the first flight, ex. 2024-01-01"
+    )
+    min_connection = serializers.IntegerField(
+        min_value=0,
+        max_value=24 * 60,
+        default=60,
+        help_text="Minimum connection time in minutes"
+    )
+    max_duration = serializers.IntegerField(
+        min_value=1,
+        max_value=72 * 60,
+        default=24 * 60,
+        help_text="Maximum total travel time in minutes"
+    )
+    max_legs = serializers.IntegerField(
+        min_value=1,
+        max_value=3,
+        default=3,
+        help_text="Maximum number of flights"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=50,
+        default=10,
+        help_text="Maximum number of itineraries"
+    )
+
+    def validate(self, data):
+        Route.validate_route(
+            data["source"],
+            data["destination"],
+            ValidationError
+        )
+        return data
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    duration = serializers.DurationField()
+    connections = serializers.IntegerField()
+    flights = FlightListSerializer(many=True)
+
+
+class PreloadedFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolve flights from the parent's ``preloaded_flights`` if set"""
+
+    def to_internal_value(self, data):
+        flights = getattr(self.parent, "preloaded_flights", None)
+        if flights is None:
+            return super().to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            flight = flights.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if flight is None:
+            self.fail("does_not_exist", pk_value=data)
+        return flight
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """Load the flights of all tickets with their airplanes in one query"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flight_ids = set()
+            for item in data:
+                try:
+                    flight_ids.add(int(item["flight"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            self.child.preloaded_flights = (
+                self.child.fields["flight"]
+                .get_queryset()
+                .select_related("airplane")
+                .in_bulk(flight_ids)
+            )
+        return super().to_internal_value(data)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = PreloadedFlightField(queryset=Flight.objects.all())
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -175,6 +292,9 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        # Taken seats are checked for the whole order by book_tickets
+        validators = []
+        list_serializer_class = TicketBatchSerializer
 
 
 class TicketListSerializer(TicketSerializer):
@@ -230,6 +350,7 @@ class FlightDetailSerializer(FlightSerializer):
     departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     tickets_available = serializers.IntegerField(read_only=True)
+    seat_map = serializers.SerializerMethodField()
     taken_places = TicketSeatsSerializer(
         source="tickets",
         many=True,
@@ -249,10 +370,28 @@ class FlightDetailSerializer(FlightSerializer):
             "airplane_name",
             "airplane_capacity",
             "tickets_available",
+            "seat_map",
             "taken_places",
             "crew",
         )
 
+    def get_fields(self):
+        """Serve the ticket list only when requested with ?seats=list"""
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if not (request and request.query_params.get("seats") == "list"):
+            fields.pop("taken_places")
+        return fields
+
+    @depends_on("airplane")
+    def get_seat_map(self, obj) -> dict:
+        seat_map = obj.get_seat_map()
+        return {
+            "rows": seat_map.rows,
+            "seats_in_row": seat_map.seats_in_row,
+            "taken": seat_map.encode(),
+        }
+
 
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
@@ -265,7 +404,7 @@ class OrderSerializer(serializers.ModelSerializer):
         data = super().validate(attrs=attrs)
         created_at = self.instance.created_at \
             if self.instance\
-            else timezone.now()
+            else self.context.get("created_at") or timezone.now()
 
         for ticket in data["tickets"]:
             Ticket.validate_ticket_flight(
@@ -277,16 +416,95 @@ class OrderSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            book_tickets(order, tickets_data)
             return order
 
 
-class OrderListSerializer(OrderSerializer):
+class OrderRequestSerializer(serializers.ModelSerializer):
+    order = OrderSerializer(read_only=True)
+
+    class Meta:
+        model = OrderRequest
+        fields = (
+            "token", "status", "created_at", "processed_at", "errors", "order"
+        )
+        read_only_fields = fields
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    expires_at = serializers.DateTimeField(
+        format="%Y-%m-%d %H:%M:%S", read_only=True
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "flight", "row", "seat", "expires_at")
+        read_only_fields = fields
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.all()
+    )
+    seats = SeatSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.MAX_SEATS_PER_REQUEST,
+    )
+
+    def validate_flight(self, flight):
+        if flight.departure_time <= timezone.now():
+            raise ValidationError(
+                "Seats can only be held on flights that have not departed."
+            )
+        return flight
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data["user"],
+            validated_data["flight"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+        )
+
+
+class SeatAssignmentSerializer(serializers.Serializer):
+    count = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.MAX_SEATS_PER_REQUEST,
+        help_text="Number of seats to book next to each other"
+    )
+
+
+class OrderSummaryMixin:
+    """Serve an order from the OrderSummary passed in the context.
+
+    Views put ``{order_id: OrderSummary}`` under "order_summaries";
+    orders without one are serialized from the database as usual.
+    """
+
+    summary_field = None
+
+    def to_representation(self, instance):
+        summaries = self.context.get("order_summaries") or {}
+        summary = summaries.get(instance.id)
+        if summary is not None:
+            data = getattr(summary, self.summary_field)
+            return {name: data[name] for name in self.fields}
+        return super().to_representation(instance)
+
+
+class OrderListSerializer(OrderSummaryMixin, OrderSerializer):
     created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     tickets = TicketListSerializer(many=True, read_only=True)
+    summary_field = "list_data"
 
 
-class OrderDetailSerializer(OrderSerializer):
+class OrderDetailSerializer(OrderSummaryMixin, OrderSerializer):
     created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     tickets = TicketDetailSerializer(many=True, read_only=True)
+    summary_field = "detail_data"
@@ -0,0 +1,217 @@
+from django.db.models import Q, QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    OrderSummary,
+    Route,
+    Ticket,
+)
+from airport.versions import bump_object_version, bump_version
+
+
+def _stored_values(instance, *fields):
+    """Values of ``fields`` in the database row of a saved instance"""
+    if instance._state.adding:
+        return None
+    return (
+        type(instance)
+        .objects.filter(pk=instance.pk)
+        .values_list(*fields)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_flight(sender, instance, **kwargs):
+    instance._stored_flight = _stored_values(instance, "flight_id")
+
+
+@receiver(post_save, sender=Ticket)
+def take_ticket_seat(sender, instance, created, **kwargs):
+    if created:
+        Flight.update_seat_map(
+            instance.flight_id, taken=[(instance.row, instance.seat)]
+        )
+        return
+
+    instance.flight.rebuild_seat_map()
+    stored = getattr(instance, "_stored_flight", None)
+    if stored and stored[0] != instance.flight_id:
+        # The ticket moved, so its seat is free on the previous flight
+        for flight in Flight.objects.select_related("airplane").filter(
+            pk=stored[0]
+        ):
+            flight.rebuild_seat_map()
+
+
+@receiver(pre_save, sender=Airplane)
+def remember_airplane_layout(sender, instance, **kwargs):
+    instance._stored_layout = _stored_values(
+        instance, "rows", "seats_in_row"
+    )
+    if instance._stored_layout not in (
+        None, (instance.rows, instance.seats_in_row)
+    ):
+        # Saves outside of forms skip clean(); seat maps can't be
+        # rebuilt with sold seats outside of the layout
+        instance.clean()
+
+
+@receiver(post_save, sender=Airplane)
+def rebuild_airplane_seat_maps(sender, instance, created, **kwargs):
+    stored = getattr(instance, "_stored_layout", None)
+    if created or not stored:
+        return
+    if stored == (instance.rows, instance.seats_in_row):
+        return
+    for flight in Flight.objects.filter(airplane=instance):
+        flight.airplane = instance
+        flight.rebuild_seat_map()
+
+
+def _deleted_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, origin=None, **kwargs):
+    seat = (instance.row, instance.seat)
+    if origin is None or _deleted_model(origin) is Ticket:
+        Flight.update_seat_map(instance.flight_id, released=[seat])
+    elif not issubclass(_deleted_model(origin), Flight):
+        # Deleted along with an order or user: release the seats once
+        # per flight when the whole delete is done, in
+        # release_cascaded_seats
+        released = vars(origin).setdefault("_released_seats", {})
+        released.setdefault(instance.flight_id, []).append(seat)
+
+
+@receiver(post_delete)
+def release_cascaded_seats(sender, origin=None, **kwargs):
+    released = vars(origin).get("_released_seats") if origin else None
+    if sender is Ticket or not released:
+        return
+    del origin._released_seats
+    for flight_id, seats in released.items():
+        Flight.update_seat_map(flight_id, released=seats)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def bump_route_version(sender, **kwargs):
+    bump_version("route")
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def bump_airport_version(sender, **kwargs):
+    bump_version("airport")
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def bump_flight_version(sender, instance, **kwargs):
+    bump_version("flight")
+    bump_object_version("flight", instance.pk)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def bump_flight_crew_version(sender, instance, reverse, pk_set, **kwargs):
+    bump_version("flight")
+    if not reverse:
+        bump_object_version("flight", instance.pk)
+    elif pk_set:
+        for flight_id in pk_set:
+            bump_object_version("flight", flight_id)
+    else:
+        bump_object_version("flight")
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def bump_ticket_version(sender, **kwargs):
+    bump_version("ticket")
+
+
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+def bump_airplane_version(sender, **kwargs):
+    bump_version("airplane")
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+def bump_airplane_type_version(sender, **kwargs):
+    bump_version("airplane_type")
+
+
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+def bump_crew_version(sender, **kwargs):
+    bump_version("crew")
+
+
+# Order summaries show tickets with their flight, route, airports,
+# airplane and crew, so a change to any of them drops the summaries of
+# the orders it appears in. Seat map updates don't show up there.
+SEAT_MAP_FIELDS = frozenset({"seat_map", "tickets_available"})
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_order_summary(sender, instance, **kwargs):
+    OrderSummary.invalidate(order_id=instance.order_id)
+
+
+@receiver(post_save, sender=Flight)
+def invalidate_flight_order_summaries(sender, instance, update_fields,
+                                      **kwargs):
+    if update_fields and SEAT_MAP_FIELDS.issuperset(update_fields):
+        return
+    OrderSummary.invalidate(order__tickets__flight=instance)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def invalidate_flight_crew_order_summaries(sender, instance, action,
+                                           reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            OrderSummary.invalidate(order__tickets__flight=instance)
+    elif action in ("post_add", "post_remove"):
+        OrderSummary.invalidate(order__tickets__flight__in=pk_set)
+    elif action == "pre_clear":
+        OrderSummary.invalidate(order__tickets__flight__crew=instance)
+
+
+@receiver(post_save, sender=Route)
+def invalidate_route_order_summaries(sender, instance, **kwargs):
+    OrderSummary.invalidate(order__tickets__flight__route=instance)
+
+
+@receiver(post_save, sender=Airport)
+def invalidate_airport_order_summaries(sender, instance, **kwargs):
+    OrderSummary.invalidate(
+        Q(order__tickets__flight__route__source=instance)
+        | Q(order__tickets__flight__route__destination=instance)
+    )
+
+
+@receiver(post_save, sender=Airplane)
+def invalidate_airplane_order_summaries(sender, instance, **kwargs):
+    OrderSummary.invalidate(order__tickets__flight__airplane=instance)
+
+
+@receiver(post_save, sender=Crew)
+def invalidate_crew_order_summaries(sender, instance, **kwargs):
+    OrderSummary.invalidate(order__tickets__flight__crew=instance)
@@ -0,0 +1,58 @@
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsMixin:
+    """Let clients pick response fields with ``?fields=id,name``.
+
+    The serializer of list and retrieve keeps only the requested fields.
+    Combined with QueryPlanningMixin, the queryset then only loads the
+    relations those fields read.
+    """
+
+    fields_query_param = "fields"
+    sparse_fields_actions = ("list", "retrieve")
+    fields_parameter = OpenApiParameter(
+        name="fields",
+        description="Comma separated fields to include in the response, "
+                    "ex. id,departure_time",
+        required=False,
+        type=str,
+    )
+
+    def get_requested_fields(self):
+        """Requested field names, or None to serve every field"""
+        if getattr(self, "action", None) not in self.sparse_fields_actions:
+            return None
+        if not hasattr(self, "_requested_fields"):
+            value = self.request.query_params.get(self.fields_query_param)
+            self._requested_fields = None
+            if value:
+                requested = {
+                    name.strip() for name in value.split(",") if name.strip()
+                }
+                available = self.get_serializer_class()(
+                    context=self.get_serializer_context()
+                ).fields
+                unknown = requested.difference(available)
+                if unknown:
+                    raise ValidationError(
+                        {
+                            self.fields_query_param: (
+                                f"Unknown field(s): "
+                                f"{', '.join(sorted(unknown))}. "
+                                f"Choose from: {', '.join(available)}."
+                            )
+                        }
+                    )
+                self._requested_fields = requested
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.get_requested_fields()
+        if requested is not None:
+            fields = getattr(serializer, "child", serializer).fields
+            for name in set(fields).difference(requested):
+                fields.pop(name)
+        return serializer
@@ -59,6 +59,24 @@ class AuthenticatedAirportAPITests(TestCase):
         self.assertEqual(response.data,
                          serializer.data)
 
+    def test_airport_list_conditional_get(self):
+        sample_airport()
+        etag = self.client.get(AIRPORT_LIST_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                AIRPORT_LIST_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        sample_airport(name="Another_name")
+        response = self.client.get(AIRPORT_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code,
+                         status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_airport_create_forbidden(self):
         response = self.client.post(
             AIRPORT_LIST_URL, {"name": "Sample_name",
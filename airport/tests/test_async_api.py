@@ -0,0 +1,198 @@
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import (
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.response_cache import response_cache
+from airport.urls import async_urlpatterns, router
+
+urlpatterns = [
+    path("sync/", include(router.urls)),
+    path("async/", include(async_urlpatterns)),
+]
+
+
+def sample_flights():
+    kyiv = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+    london = Airport.objects.create(name="Heathrow", closest_big_city="London")
+    airplane = Airplane.objects.create(
+        name="Boeing 737",
+        rows=10,
+        seats_in_row=4,
+        airplane_type=AirplaneType.objects.create(name="Boeing"),
+    )
+    departure_time = timezone.now() + timedelta(days=1)
+    flights = []
+    for index, (source, destination) in enumerate(
+        [(kyiv, london), (london, kyiv)]
+    ):
+        route = Route.objects.create(
+            source=source, destination=destination, distance=2000
+        )
+        flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time + timedelta(hours=5 * index),
+            arrival_time=departure_time + timedelta(hours=5 * index + 3),
+        )
+        flights.append(flight)
+    return flights
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncReadAPITests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test123",
+        )
+        self.flights = sample_flights()
+        Ticket.objects.create(
+            order=Order.objects.create(user=self.user),
+            flight=self.flights[0],
+            row=2,
+            seat=3,
+        )
+        self.headers = {
+            "authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+    async def assert_same_response(self, url, **params):
+        response_cache.clear()
+        sync_response = await self.async_client.get(
+            f"/sync/{url}", params, headers=self.headers
+        )
+        response_cache.clear()
+        async_response = await self.async_client.get(
+            f"/async/{url}", params, headers=self.headers
+        )
+
+        self.assertEqual(
+            async_response.status_code, sync_response.status_code
+        )
+        self.assertEqual(async_response.json(), sync_response.json())
+        return async_response
+
+    async def test_flight_list(self):
+        response = await self.assert_same_response("flights/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+
+    async def test_flight_list_filters_and_pagination(self):
+        source_id = self.flights[0].route.source_id
+
+        await self.assert_same_response("flights/", source=str(source_id))
+        await self.assert_same_response("flights/", page="2")
+        await self.assert_same_response("flights/", pagination="cursor")
+        await self.assert_same_response("flights/", date="not a date")
+
+    async def test_flight_retrieve(self):
+        url = f"flights/{self.flights[0].id}/"
+
+        response = await self.assert_same_response(url)
+        await self.assert_same_response(url, seats="list")
+
+        self.assertEqual(response.json()["tickets_available"], 39)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    async def test_flight_retrieve_conditional_get(self):
+        url = f"/async/flights/{self.flights[0].id}/"
+        etag = (await self.async_client.get(url, headers=self.headers))[
+            "ETag"
+        ]
+
+        response = await self.async_client.get(
+            url, headers={**self.headers, "if-none-match": etag}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    async def test_version_counters_read_off_the_event_loop(self):
+        get_many = cache.get_many
+        on_loop = []
+
+        def checked_get_many(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(args)
+            except RuntimeError:
+                pass
+            return get_many(*args, **kwargs)
+
+        with mock.patch.object(cache, "get_many", checked_get_many):
+            for url in (f"flights/{self.flights[0].id}/", "routes/"):
+                response = await self.async_client.get(
+                    f"/async/{url}", headers=self.headers
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(on_loop, [])
+
+    async def test_flight_retrieve_not_found(self):
+        response = await self.assert_same_response("flights/0/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_routes_and_airports(self):
+        route_id = self.flights[0].route_id
+        airport_id = self.flights[0].route.source_id
+
+        await self.assert_same_response("routes/")
+        await self.assert_same_response(
+            "routes/", destination=str(airport_id)
+        )
+        await self.assert_same_response(f"routes/{route_id}/")
+        await self.assert_same_response("airports/")
+        await self.assert_same_response(f"airports/{airport_id}/")
+
+    async def test_flight_export_streams_under_asgi(self):
+        response = await self.async_client.get(
+            "/sync/flights/export/", {"output": "csv"}, headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b"".join(
+            [chunk async for chunk in response.streaming_content]
+        )
+        lines = content.decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            [line.split(",")[0] for line in lines[1:]],
+            [str(flight.id) for flight in self.flights],
+        )
+
+    async def test_auth_required(self):
+        self.headers = {}
+
+        response = await self.assert_same_response("flights/")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_writes_use_sync_view(self):
+        response = await self.async_client.post(
+            "/async/airports/",
+            {"name": "Schiphol", "closest_big_city": "Amsterdam"},
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
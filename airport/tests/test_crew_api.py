@@ -43,6 +43,17 @@ class AuthenticatedCrewAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_crew_list_conditional_get(self):
+        member = sample_crew_member()
+        etag = self.client.get(CREW_LIST_URL)["ETag"]
+
+        member.last_name = "Changed"
+        member.save()
+        response = self.client.get(CREW_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_crew_detail(self):
         member = sample_crew_member()
         response = self.client.get(CREW_DETAIL_URL)
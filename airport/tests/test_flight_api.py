@@ -1,10 +1,22 @@
+import base64
+import json
+import tempfile
 from datetime import datetime, timezone, timedelta
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.db.models import F, Count
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIClient
 
 from airport.models import (
@@ -13,15 +25,34 @@ from airport.models import (
     AirplaneType,
     Airplane,
     Flight,
-    Crew
+    Crew,
+    Order,
+    Ticket,
 )
+from airport.query_planning import plan_serializer
+from airport.response_cache import ResponseCache, response_cache
+from airport.seat_assignment import find_seats
+from airport.seat_map import SeatMap
 from airport.serializers import (FlightListSerializer,
-                                 FlightDetailSerializer)
+                                 FlightDetailSerializer,
+                                 FlightSerializer,
+                                 TicketDetailSerializer)
+from airport.tests.utils import QueryCountMixin
 
 FLIGHT_LIST_URL = reverse("airport:flight-list")
 FLIGHT_DETAIL_URL = reverse(
     "airport:flight-detail",
     kwargs={"pk": 1})
+FLIGHT_IMPORT_URL = reverse("airport:flight-import-schedule")
+FLIGHT_EXPORT_URL = reverse("airport:flight-export")
+
+
+def detail_url(flight_id):
+    return reverse("airport:flight-detail", kwargs={"pk": flight_id})
+
+
+def assign_seats_url(flight_id):
+    return reverse("airport:flight-assign-seats", kwargs={"pk": flight_id})
 
 
 def get_flight_data():
@@ -87,7 +118,7 @@ class UnauthenticatedFlightAPITests(TestCase):
                          status.HTTP_401_UNAUTHORIZED)
 
 
-class AuthenticatedFlightAPITests(TestCase):
+class AuthenticatedFlightAPITests(QueryCountMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
@@ -181,6 +212,308 @@ class AuthenticatedFlightAPITests(TestCase):
         self.assertEqual(response_date.status_code, status.HTTP_200_OK)
         self.assertEqual(response_date.data["results"], serializer_date.data)
 
+    def test_flight_list_departure_range_filters(self):
+        flight_data = get_flight_data()
+        early_flight = sample_flight(**flight_data)
+        flight_data["departure_time"] = datetime(
+            2024, 10, 26, 23, 30, tzinfo=timezone.utc
+        )
+        flight_data["arrival_time"] = datetime(
+            2024, 10, 27, 1, 0, tzinfo=timezone.utc
+        )
+        late_flight = sample_flight(**flight_data)
+
+        for params, expected_ids in [
+            ({"date": "2024-10-26"}, [late_flight.id]),
+            ({"departure_after": "2024-10-26"}, [late_flight.id]),
+            ({"departure_before": "2024-10-26"}, [early_flight.id]),
+            (
+                {
+                    "departure_after": "2024-10-25T01:00:00Z",
+                    "departure_before": "2024-10-26T23:30:00Z",
+                },
+                [early_flight.id],
+            ),
+        ]:
+            response = self.client.get(FLIGHT_LIST_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [flight["id"] for flight in response.data["results"]],
+                expected_ids,
+            )
+
+    def test_flight_list_invalid_date_filter(self):
+        for params in [
+            {"date": "2024-13-01"},
+            {"date": "2024-10-25T10:00:00"},
+            {"departure_after": "tomorrow"},
+        ]:
+            response = self.client.get(FLIGHT_LIST_URL, params)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_flight_list_cursor_pagination(self):
+        flight_data = get_flight_data()
+        departure_time = flight_data["departure_time"]
+        for hours in range(7):
+            flight_data["departure_time"] = (
+                departure_time + timedelta(hours=hours)
+            )
+            flight_data["arrival_time"] = (
+                flight_data["departure_time"] + timedelta(hours=1)
+            )
+            sample_flight(**flight_data)
+
+        response = self.client.get(FLIGHT_LIST_URL, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(len(response.data["results"]), 5)
+
+        next_page = self.client.get(response.data["next"])
+        self.assertEqual(len(next_page.data["results"]), 2)
+        self.assertIsNone(next_page.data["next"])
+        listed_ids = [
+            flight["id"]
+            for flight in response.data["results"] + next_page.data["results"]
+        ]
+        self.assertEqual(
+            listed_ids,
+            list(
+                Flight.objects.order_by(
+                    "departure_time", "arrival_time", "id"
+                ).values_list("id", flat=True)
+            ),
+        )
+
+    def test_flight_list_cursor_pagination_seeks_past_ties(self):
+        flight_data = get_flight_data()
+
+        def add_flight(index):
+            flight_data["airplane"] = Airplane.objects.create(
+                name=f"Tie {index}",
+                rows=1,
+                seats_in_row=1,
+                airplane_type=flight_data["airplane"].airplane_type,
+            )
+            return sample_flight(**flight_data)
+
+        flights = [add_flight(index) for index in range(7)]
+
+        first_page = self.client.get(
+            FLIGHT_LIST_URL, {"pagination": "cursor"}
+        )
+        # Every flight shares the same times, so the pages are told
+        # apart by id; deleting a listed flight must not shift them
+        flights.pop(0).delete()
+        with CaptureQueriesContext(connection) as queries:
+            next_page = self.client.get(first_page.data["next"])
+        seek_queries = [
+            query["sql"] for query in queries if "ROW(" in query["sql"]
+        ]
+        previous_page = self.client.get(next_page.data["previous"])
+
+        self.assertEqual(
+            [flight["id"] for flight in next_page.data["results"]],
+            [flight.id for flight in flights[4:]],
+        )
+        self.assertIsNone(next_page.data["next"])
+        self.assertEqual(
+            [flight["id"] for flight in previous_page.data["results"]],
+            [flight.id for flight in flights[:4]],
+        )
+        self.assertEqual(len(seek_queries), 1)
+        self.assertNotIn("OFFSET", seek_queries[0])
+
+    def test_flight_list_invalid_cursor(self):
+        # base64 of "p=not-json"
+        response = self.client.get(
+            FLIGHT_LIST_URL, {"cursor": "cD1ub3QtanNvbg=="}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_flight_list_page_number_pagination_by_default(self):
+        sample_flight()
+        response = self.client.get(FLIGHT_LIST_URL)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_flight_list_sparse_fields(self):
+        sample_flight()
+        response_cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                FLIGHT_LIST_URL, {"fields": "id,departure_time"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(response.data["results"][0]), ["id", "departure_time"]
+        )
+        for query in queries.captured_queries:
+            self.assertNotIn("JOIN", query["sql"])
+            self.assertNotIn("airport_crew", query["sql"])
+
+    def test_flight_retrieve_sparse_fields(self):
+        flight = sample_flight()
+
+        response = self.client.get(
+            detail_url(flight.id), {"fields": "tickets_available, id"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data, {"id": flight.id, "tickets_available": 240}
+        )
+
+    def test_flight_list_unknown_sparse_field(self):
+        response = self.client.get(FLIGHT_LIST_URL, {"fields": "id,price"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("price", response.data["fields"])
+
+    def test_flight_list_query_count_constant(self):
+        first_flight = sample_flight()
+        flights = [first_flight]
+
+        def add_flights(count):
+            for _ in range(count):
+                departure_time = flights[-1].arrival_time + timedelta(days=1)
+                flight = sample_flight(
+                    route=first_flight.route,
+                    airplane=first_flight.airplane,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + timedelta(hours=1),
+                )
+                flight.crew.add(
+                    Crew.objects.create(first_name="Jo", last_name="Ko")
+                )
+                flights.append(flight)
+
+        def list_flights():
+            response_cache.clear()
+            response = self.client.get(FLIGHT_LIST_URL)
+            self.assertEqual(
+                len(response.data["results"]), len(flights)
+            )
+
+        self.assertConstantQueries(add_flights, list_flights, sizes=(0, 4))
+
+    def test_flight_list_fast_path_matches_serializer(self):
+        flight = sample_flight()
+        flight.crew.add(
+            Crew.objects.create(first_name="Jo", last_name="Ko"),
+            Crew.objects.create(first_name="Ann", last_name="Lee"),
+        )
+        response_cache.clear()
+
+        response = self.client.get(FLIGHT_LIST_URL)
+        cursor_response = self.client.get(
+            FLIGHT_LIST_URL, {"pagination": "cursor", "fields": "crew,id"}
+        )
+
+        serializer = FlightListSerializer(Flight.objects.all(), many=True)
+        self.assertEqual(response.json()["results"], serializer.data)
+        self.assertEqual(
+            cursor_response.json()["results"],
+            [{"id": flight.id, "crew": ["Jo Ko", "Ann Lee"]}],
+        )
+
+    def test_flight_export_ndjson(self):
+        flight = sample_flight()
+
+        response = self.client.get(FLIGHT_EXPORT_URL)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {
+                    "id": flight.id,
+                    "full_route": "KRK - PMI",
+                    "departure_time": "2024-10-25T01:00:00+00:00",
+                    "arrival_time": "2024-10-25T02:00:00+00:00",
+                    "airplane_name": "BO1234",
+                    "capacity": 240,
+                    "tickets_available": 240,
+                }
+            ],
+        )
+
+    def test_flight_export_csv_with_filters(self):
+        flight = sample_flight()
+
+        response = self.client.get(
+            FLIGHT_EXPORT_URL,
+            {"output": "csv", "source": flight.route.source_id},
+        )
+        other_source = self.client.get(
+            FLIGHT_EXPORT_URL,
+            {"output": "csv", "source": flight.route.destination_id},
+        )
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            lines[0],
+            "id,full_route,departure_time,arrival_time,airplane_name,"
+            "capacity,tickets_available",
+        )
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(
+            len(b"".join(other_source.streaming_content).splitlines()), 1
+        )
+
+    def test_flight_export_unknown_output(self):
+        response = self.client.get(FLIGHT_EXPORT_URL, {"output": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_flight_retrieve_reads_versions_once(self):
+        flight = sample_flight()
+        self.client.get(detail_url(flight.id))
+
+        with mock.patch.object(
+            cache, "get_many", wraps=cache.get_many
+        ) as get_many:
+            response = self.client.get(detail_url(flight.id))
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        get_many.assert_called_once()
+
+    def test_flight_list_response_cache(self):
+        flight = sample_flight()
+        response = self.client.get(FLIGHT_LIST_URL, {"date": "2024-10-25"})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        response = self.client.get(FLIGHT_LIST_URL, {"date": "2024-10-25"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["count"], 1)
+
+        flight.crew.add(Crew.objects.create(first_name="Jo", last_name="Ko"))
+        response = self.client.get(FLIGHT_LIST_URL, {"date": "2024-10-25"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["crew"], ["Jo Ko"])
+
+    def test_flight_retrieve_response_cache_invalidated_by_ticket(self):
+        flight = sample_flight()
+        self.client.get(detail_url(flight.id))
+
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        response = self.client.get(detail_url(flight.id))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["tickets_available"], 239)
+
+    def test_flight_cache_stats_admin_only(self):
+        response = self.client.get(reverse("airport:flight-cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_flight_retrieve(self):
         sample_flight()
         response = self.client.get(FLIGHT_DETAIL_URL)
@@ -188,19 +521,256 @@ class AuthenticatedFlightAPITests(TestCase):
         flight = (
             Flight.objects.select_related("route", "airplane")
             .prefetch_related("crew")
-            .annotate(
-                tickets_available=(
-                    F("airplane__rows")
-                    * F("airplane__seats_in_row")
-                    - Count("tickets")
-                )
-            )
             .get(pk=1)
         )
         serializer = FlightDetailSerializer(flight)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_flight_retrieve_etag_per_flight(self):
+        flight = sample_flight()
+        other_flight = sample_flight(
+            route=flight.route,
+            airplane=flight.airplane,
+            departure_time=flight.arrival_time + timedelta(hours=2),
+            arrival_time=flight.arrival_time + timedelta(hours=4),
+        )
+        order = Order.objects.create(user=self.user)
+        etag = self.client.get(detail_url(flight.id))["ETag"]
+
+        Ticket.objects.create(order=order, flight=other_flight, row=1, seat=1)
+        response = self.client.get(
+            detail_url(flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Ticket.objects.create(order=order, flight=flight, row=1, seat=1)
+        response = self.client.get(
+            detail_url(flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_flight_retrieve_if_none_match_any_not_found(self):
+        response = self.client.get(detail_url(0), HTTP_IF_NONE_MATCH="*")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_flight_retrieve_seat_map(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=2, seat=5, flight=flight, order=order)
+
+        response = self.client.get(detail_url(flight.id))
+
+        seat_map = response.data["seat_map"]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("taken_places", response.data)
+        self.assertEqual(seat_map["rows"], 40)
+        self.assertEqual(seat_map["seats_in_row"], 6)
+        taken = base64.b64decode(seat_map["taken"])
+        self.assertEqual(len(taken), 30)
+        self.assertEqual(taken[0], 0b10000000)
+        self.assertEqual(taken[1], 0b00100000)
+
+    def test_flight_retrieve_seat_map_after_ticket_delete(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=order
+        )
+        ticket.delete()
+
+        response = self.client.get(detail_url(flight.id))
+        taken = base64.b64decode(response.data["seat_map"]["taken"])
+        self.assertEqual(taken, bytes(30))
+
+    def test_flight_tickets_available_counter(self):
+        flight = sample_flight()
+        self.assertEqual(flight.tickets_available, 240)
+
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=order
+        )
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 238)
+
+        ticket.delete()
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 239)
+
+        order.delete()
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 240)
+
+    def test_flight_seat_maps_rebuilt_when_airplane_layout_changes(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=2, seat=5, flight=flight, order=order)
+
+        airplane = flight.airplane
+        airplane.seats_in_row = 5
+        airplane.save()
+
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 199)
+        self.assertEqual(
+            list(flight.get_seat_map().taken_places()), [(2, 5)]
+        )
+
+    def test_airplane_layout_without_sold_seats_invalid(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=40, seat=1, flight=flight, order=order)
+
+        airplane = flight.airplane
+        airplane.rows = 39
+        with self.assertRaises(DjangoValidationError):
+            airplane.clean()
+        with self.assertRaises(DjangoValidationError):
+            airplane.save()
+
+        airplane.refresh_from_db()
+        self.assertEqual(airplane.rows, 40)
+
+    def test_ticket_moved_to_other_flight_frees_its_seat(self):
+        flight = sample_flight()
+        other_flight = sample_flight(
+            route=flight.route,
+            airplane=flight.airplane,
+            departure_time=flight.arrival_time + timedelta(hours=2),
+            arrival_time=flight.arrival_time + timedelta(hours=4),
+        )
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=order
+        )
+
+        ticket.flight = other_flight
+        ticket.save()
+
+        flight.refresh_from_db()
+        other_flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 240)
+        self.assertFalse(flight.get_seat_map().is_taken(1, 1))
+        self.assertEqual(other_flight.tickets_available, 239)
+        self.assertTrue(other_flight.get_seat_map().is_taken(1, 1))
+
+    def test_cascaded_ticket_deletes_release_seats_once_per_flight(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=flight, order=order
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            order.delete()
+
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 240)
+        self.assertEqual(flight.get_seat_map().taken_count, 0)
+        locks = [
+            query for query in queries if "FOR UPDATE" in query["sql"]
+        ]
+        self.assertEqual(len(locks), 1)
+
+        Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=Order.objects.create(
+                user=self.user
+            )
+        )
+        with CaptureQueriesContext(connection) as queries:
+            flight.delete()
+        self.assertFalse(
+            any("FOR UPDATE" in query["sql"] for query in queries)
+        )
+
+    def test_reconcile_tickets_available(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Flight.objects.update(tickets_available=0)
+
+        Flight.reconcile_tickets_available()
+
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 239)
+
+    def test_flight_retrieve_taken_places_list(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=2, seat=3, flight=flight, order=order)
+
+        response = self.client.get(detail_url(flight.id), {"seats": "list"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["taken_places"], [{"row": 2, "seat": 3}]
+        )
+
+    def future_flight(self):
+        data = get_flight_data()
+        data["departure_time"] = datetime.now(timezone.utc) + timedelta(1)
+        data["arrival_time"] = data["departure_time"] + timedelta(hours=1)
+        return sample_flight(**data)
+
+    def test_assign_seats_together(self):
+        flight = self.future_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=flight, row=1, seat=3)
+
+        response = self.client.post(
+            assign_seats_url(flight.id), {"count": 3}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"])
+             for ticket in response.data["tickets"]],
+            [(1, 4), (1, 5), (1, 6)],
+        )
+        flight.refresh_from_db()
+        self.assertEqual(flight.tickets_available, 40 * 6 - 4)
+
+    def test_assign_seats_not_enough_free_seats(self):
+        flight = self.future_flight()
+        Airplane.objects.filter(pk=flight.airplane_id).update(
+            rows=1, seats_in_row=2
+        )
+        flight.refresh_from_db()
+        flight.rebuild_seat_map()
+
+        response = self.client.post(
+            assign_seats_url(flight.id), {"count": 3}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", response.data)
+        self.assertFalse(Order.objects.exists())
+
+    def test_assign_seats_count_above_limit(self):
+        flight = self.future_flight()
+
+        response = self.client.post(
+            assign_seats_url(flight.id), {"count": 10}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", response.data)
+        self.assertFalse(Order.objects.exists())
+
+    def test_assign_seats_departed_flight(self):
+        flight = sample_flight()
+
+        response = self.client.post(
+            assign_seats_url(flight.id), {"count": 1}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_flight_create_forbidden(self):
         data = get_flight_data()
         data["route"] = data["route"].id
@@ -331,6 +901,154 @@ class AdminFlightAPITests(TestCase):
         response = self.client.post(FLIGHT_LIST_URL, data=flight_2_data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def get_schedule(self):
+        data = get_flight_data()
+        route_back = Route.objects.create(
+            source=data["route"].destination,
+            destination=data["route"].source,
+            distance=1000,
+        )
+        crew_member = Crew.objects.create(first_name="John", last_name="Doe")
+        return [
+            {
+                "route": route_back.id,
+                "airplane": data["airplane"].id,
+                "departure_time": "2024-10-25T06:00:00Z",
+                "arrival_time": "2024-10-25T08:00:00Z",
+                "crew": [crew_member.id],
+            },
+            {
+                "route": data["route"].id,
+                "airplane": data["airplane"].id,
+                "departure_time": "2024-10-25T01:00:00Z",
+                "arrival_time": "2024-10-25T02:00:00Z",
+                "crew": [crew_member.id],
+            },
+        ]
+
+    def test_flight_import(self):
+        schedule = self.get_schedule()
+
+        response = self.client.post(
+            FLIGHT_IMPORT_URL, schedule, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        flights = Flight.objects.order_by("departure_time")
+        self.assertEqual(
+            [flight.route_id for flight in flights],
+            [schedule[1]["route"], schedule[0]["route"]],
+        )
+        self.assertEqual(flights[0].tickets_available, 240)
+        self.assertEqual(
+            list(flights[0].crew.values_list("id", flat=True)),
+            schedule[0]["crew"],
+        )
+
+    def test_flight_import_csv(self):
+        schedule = self.get_schedule()
+        lines = ["route,airplane,departure_time,arrival_time,crew"] + [
+            f"{row['route']},{row['airplane']},{row['departure_time']},"
+            f"{row['arrival_time']},{row['crew'][0]}"
+            for row in schedule
+        ]
+        upload = SimpleUploadedFile(
+            "schedule.csv", "\n".join(lines).encode()
+        )
+
+        response = self.client.post(
+            FLIGHT_IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Flight.objects.count(), 2)
+
+    def test_flight_import_non_utf8_file(self):
+        upload = SimpleUploadedFile(
+            "schedule.csv", "route,départ\n".encode("latin-1")
+        )
+
+        response = self.client.post(
+            FLIGHT_IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("UTF-8", response.data["file"])
+
+    def test_import_flights_command_non_utf8_file(self):
+        with tempfile.NamedTemporaryFile(suffix=".csv") as schedule_file:
+            schedule_file.write("route,départ\n".encode("latin-1"))
+            schedule_file.flush()
+
+            with self.assertRaises(CommandError):
+                call_command(
+                    "import_flights", schedule_file.name, stderr=StringIO()
+                )
+
+    def test_flight_import_reports_all_violations(self):
+        schedule = self.get_schedule()
+        schedule[0]["departure_time"] = "2024-10-25T03:00:00Z"
+        schedule.append(
+            {
+                "route": schedule[1]["route"],
+                "airplane": schedule[1]["airplane"],
+                "departure_time": "2024-10-27T10:00:00Z",
+                "arrival_time": "2024-10-27T09:00:00Z",
+            }
+        )
+        schedule.append({"route": 0, "airplane": 0})
+
+        response = self.client.post(
+            FLIGHT_IMPORT_URL, schedule, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data), 4)
+        self.assertIn("3-hour rest", response.data[0]["non_field_errors"][0])
+        self.assertEqual(response.data[1], {})
+        self.assertIn("non_field_errors", response.data[2])
+        self.assertIn("departure_time", response.data[3])
+        self.assertEqual(Flight.objects.count(), 0)
+
+    def test_flight_cache_stats(self):
+        response = self.client.get(reverse("airport:flight-cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("hits", response.data)
+        self.assertIn("misses", response.data)
+
+    def test_overlapping_flights_rejected_by_database(self):
+        flight = sample_flight()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Flight.objects.create(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=flight.departure_time - timedelta(minutes=30),
+                arrival_time=flight.departure_time + timedelta(minutes=30),
+            )
+
+        Flight.objects.create(
+            route=flight.route,
+            airplane=flight.airplane,
+            departure_time=flight.arrival_time,
+            arrival_time=flight.arrival_time + timedelta(hours=1),
+        )
+
+    def test_overlap_violation_mapped_to_validation_error(self):
+        flight = sample_flight()
+        validated_data = {
+            "route": flight.route,
+            "airplane": flight.airplane,
+            "departure_time": flight.departure_time - timedelta(hours=2),
+            "arrival_time": flight.departure_time + timedelta(minutes=30),
+            "crew": [],
+        }
+
+        with self.assertRaisesMessage(
+            ValidationError, "before the previous flight arrives"
+        ):
+            FlightSerializer().create(validated_data)
+
     def test_flight_delete_not_allowed(self):
         sample_flight()
         response = self.client.delete(FLIGHT_DETAIL_URL)
@@ -369,3 +1087,93 @@ class AdminFlightAPITests(TestCase):
             response.status_code,
             status.HTTP_405_METHOD_NOT_ALLOWED
         )
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def test_lru_eviction_and_stats(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+
+
+class SeatAssignmentTests(SimpleTestCase):
+    def seat_map(self, *taken, rows=3, seats_in_row=4):
+        seat_map = SeatMap(rows, seats_in_row)
+        for row, seat in taken:
+            seat_map.take(row, seat)
+        return seat_map
+
+    def test_prefers_smallest_gap_in_one_row(self):
+        seat_map = self.seat_map((1, 3), (2, 1), (2, 4))
+
+        self.assertEqual(find_seats(seat_map, 2), [(1, 1), (1, 2)])
+        self.assertEqual(
+            find_seats(seat_map, 2, unavailable={(1, 1)}),
+            [(2, 2), (2, 3)],
+        )
+
+    def test_splits_row_before_using_several_rows(self):
+        seat_map = self.seat_map((1, 2), (2, 1), (2, 2), (3, 1), (3, 2))
+
+        self.assertEqual(find_seats(seat_map, 3), [(1, 1), (1, 3), (1, 4)])
+
+    def test_uses_fewest_adjacent_rows(self):
+        seat_map = self.seat_map(
+            (1, 1), (1, 2), (1, 3), (2, 1), (2, 2), (3, 1)
+        )
+
+        self.assertEqual(
+            find_seats(seat_map, 5),
+            [(2, 3), (2, 4), (3, 2), (3, 3), (3, 4)],
+        )
+
+    def test_not_enough_free_seats(self):
+        seat_map = self.seat_map(rows=1, seats_in_row=2)
+
+        self.assertIsNone(find_seats(seat_map, 3))
+
+
+class QueryPlanTests(SimpleTestCase):
+    def test_slug_and_property_sources_are_joined(self):
+        plan = plan_serializer(FlightListSerializer())
+
+        self.assertEqual(
+            list(plan.select_paths()),
+            ["route", "route__source", "route__destination", "airplane"],
+        )
+        self.assertEqual(list(plan.prefetch_lookups()), ["crew"])
+
+    def test_nested_serializer_relations(self):
+        plan = plan_serializer(TicketDetailSerializer(many=True))
+
+        self.assertEqual(
+            list(plan.select_paths()),
+            [
+                "flight",
+                "flight__route",
+                "flight__route__source",
+                "flight__route__destination",
+                "flight__airplane",
+            ],
+        )
+        self.assertEqual(list(plan.prefetch_lookups()), ["flight__crew"])
+
+    def test_sparse_fields_only_plan_their_relations(self):
+        serializer = FlightListSerializer()
+        for name in ("route", "crew"):
+            serializer.fields.pop(name)
+
+        plan = plan_serializer(serializer)
+
+        self.assertEqual(list(plan.select_paths()), ["airplane"])
+        self.assertEqual(list(plan.prefetch_lookups()), [])
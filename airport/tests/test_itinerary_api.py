@@ -0,0 +1,149 @@
+from datetime import datetime, timezone, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+)
+
+ITINERARY_LIST_URL = reverse("airport:itinerary-list")
+DAY = datetime(2024, 10, 25, tzinfo=timezone.utc)
+
+
+def sample_airplane(name):
+    airplane_type, _ = AirplaneType.objects.get_or_create(name="Boeing")
+    return Airplane.objects.create(
+        name=name,
+        rows=10,
+        seats_in_row=4,
+        airplane_type=airplane_type,
+    )
+
+
+def sample_flight(source, destination, departure_hour, hours, airplane):
+    route, _ = Route.objects.get_or_create(
+        source=source, destination=destination, defaults={"distance": 500}
+    )
+    departure_time = DAY + timedelta(hours=departure_hour)
+    return Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=hours),
+    )
+
+
+class UnauthenticatedItineraryAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        response = self.client.get(ITINERARY_LIST_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedItineraryAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test123",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.krk, self.waw, self.ber, self.pmi = [
+            Airport.objects.create(name=name, closest_big_city=name)
+            for name in ("KRK", "WAW", "BER", "PMI")
+        ]
+        self.airplanes = [sample_airplane(f"BO{i}") for i in range(6)]
+
+    def search(self, **params):
+        query = {
+            "source": self.krk.id,
+            "destination": self.pmi.id,
+            "date": "2024-10-25",
+        }
+        query.update(params)
+        return self.client.get(ITINERARY_LIST_URL, query)
+
+    def test_direct_and_connecting_itineraries(self):
+        direct = sample_flight(self.krk, self.pmi, 12, 3, self.airplanes[0])
+        first_leg = sample_flight(self.krk, self.waw, 6, 1, self.airplanes[1])
+        second_leg = sample_flight(
+            self.waw, self.pmi, 8, 3, self.airplanes[2]
+        )
+
+        response = self.search()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [flight["id"] for flight in itinerary["flights"]]
+                for itinerary in response.data
+            ],
+            [[first_leg.id, second_leg.id], [direct.id]],
+        )
+        self.assertEqual(response.data[0]["connections"], 1)
+        self.assertEqual(response.data[0]["duration"], "05:00:00")
+        self.assertEqual(
+            response.data[0]["departure_time"], "2024-10-25 06:00:00"
+        )
+
+    def test_minimum_connection_time(self):
+        sample_flight(self.krk, self.waw, 6, 1, self.airplanes[0])
+        sample_flight(self.waw, self.pmi, 7.75, 3, self.airplanes[1])
+
+        self.assertEqual(len(self.search(min_connection=30).data), 1)
+        self.assertEqual(self.search(min_connection=90).data, [])
+
+    def test_maximum_duration_and_legs(self):
+        sample_flight(self.krk, self.waw, 1, 1, self.airplanes[0])
+        sample_flight(self.waw, self.ber, 3, 1, self.airplanes[1])
+        sample_flight(self.ber, self.pmi, 5, 2, self.airplanes[2])
+
+        self.assertEqual(len(self.search().data), 1)
+        self.assertEqual(self.search(max_legs=2).data, [])
+        self.assertEqual(self.search(max_duration=5 * 60).data, [])
+
+    def test_itineraries_do_not_revisit_airports(self):
+        sample_flight(self.krk, self.waw, 1, 1, self.airplanes[0])
+        sample_flight(self.waw, self.krk, 3, 1, self.airplanes[1])
+        sample_flight(self.krk, self.pmi, 6, 2, self.airplanes[2])
+
+        response = self.search()
+        self.assertEqual(
+            [len(itinerary["flights"]) for itinerary in response.data], [1]
+        )
+
+    def test_limit(self):
+        for hour in range(4):
+            sample_flight(self.krk, self.pmi, hour, 2, self.airplanes[hour])
+
+        self.assertEqual(len(self.search(limit=2).data), 2)
+
+    def test_invalid_search(self):
+        self.assertEqual(
+            self.search(destination=self.krk.id).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.search(max_legs=4).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        for name in ("max_duration", "min_connection"):
+            self.assertEqual(
+                self.search(**{name: 10000000000000}).status_code,
+                status.HTTP_400_BAD_REQUEST,
+            )
+        self.assertEqual(
+            self.client.get(ITINERARY_LIST_URL).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
@@ -1,8 +1,13 @@
+import json
 from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -15,11 +20,22 @@ from airport.models import (
     Airplane,
     Flight,
     Order,
+    OrderRequest,
+    OrderSummary,
     Ticket
 )
-from airport.serializers import OrderListSerializer, OrderDetailSerializer
+from airport.order_queue import process_order_queue
+from airport.order_summaries import build_order_summaries
+from airport.serializers import (
+    OrderDetailSerializer,
+    OrderListSerializer,
+    OrderSerializer,
+)
+from airport.tests.utils import QueryCountMixin
+from airport.throttling import ScopedBucketThrottle
 
 ORDER_LIST_URL = reverse("airport:order-list")
+ORDER_EXPORT_URL = reverse("airport:order-export")
 ORDER_DETAIL_URL = reverse("airport:order-detail", kwargs={"pk": 1})
 
 
@@ -61,7 +77,7 @@ class UnauthenticatedOrderAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class AuthenticatedOrderAPITests(TestCase):
+class AuthenticatedOrderAPITests(QueryCountMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
@@ -87,6 +103,29 @@ class AuthenticatedOrderAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(serializer.data, response.data["results"])
 
+    def test_order_list_cursor_pagination(self):
+        flight = sample_flight()
+        for seat in range(1, 7):
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(row=1, seat=seat, flight=flight, order=order)
+
+        response = self.client.get(ORDER_LIST_URL, {"pagination": "cursor"})
+        next_page = self.client.get(response.data["next"])
+
+        listed_ids = [
+            order["id"]
+            for order in response.data["results"] + next_page.data["results"]
+        ]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            listed_ids,
+            list(
+                Order.objects.order_by("-created_at", "-id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
     def test_order_retrieve(self):
         flight = sample_flight()
         order = Order.objects.create(user=self.user)
@@ -102,6 +141,142 @@ class AuthenticatedOrderAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(serializer.data, response.data)
 
+    def test_order_list_served_from_summaries(self):
+        flight = sample_flight()
+
+        def list_orders():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(ORDER_LIST_URL)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return response, len(queries)
+
+        def book(seat):
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(row=1, seat=seat, flight=flight, order=order)
+
+        book(1)
+        list_orders()
+        _, one_order_queries = list_orders()
+        for seat in range(2, 6):
+            book(seat)
+        list_orders()
+        response, five_orders_queries = list_orders()
+
+        orders = Order.objects.all()
+        self.assertEqual(OrderSummary.objects.count(), 5)
+        self.assertEqual(
+            OrderListSerializer(orders, many=True).data,
+            response.data["results"],
+        )
+        self.assertEqual(one_order_queries, five_orders_queries)
+
+    def test_order_summaries_built_with_constant_queries(self):
+        flight = sample_flight()
+        orders = []
+
+        def add_orders(count):
+            for _ in range(count):
+                order = Order.objects.create(user=self.user)
+                row = len(orders) + 1
+                for seat in (1, 2):
+                    Ticket.objects.create(
+                        row=row, seat=seat, flight=flight, order=order
+                    )
+                orders.append(order)
+
+        self.assertConstantQueries(
+            add_orders,
+            lambda: build_order_summaries([order.id for order in orders]),
+        )
+
+    def test_order_export_csv(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        for seat in (2, 1):
+            Ticket.objects.create(row=1, seat=seat, flight=flight, order=order)
+        other_user = get_user_model().objects.create_user(
+            email="other@test.com", password="test123"
+        )
+        Ticket.objects.create(
+            row=2,
+            seat=1,
+            flight=flight,
+            order=Order.objects.create(user=other_user),
+        )
+
+        response = self.client.get(ORDER_EXPORT_URL, {"output": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            lines[0],
+            "order_id,created_at,id,row,seat,flight_id,full_route,"
+            "departure_time,arrival_time",
+        )
+        self.assertEqual(
+            [line.split(",")[3:5] for line in lines[1:]],
+            [["1", "1"], ["1", "2"]],
+        )
+
+    def test_export_command(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        out = StringIO()
+        call_command(
+            "export", "orders", "--user", self.user.email, stdout=out
+        )
+
+        self.assertEqual(
+            [json.loads(line)["id"] for line in out.getvalue().splitlines()],
+            list(order.tickets.values_list("id", flat=True)),
+        )
+
+    def test_order_list_sparse_fields(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        response = self.client.get(ORDER_LIST_URL, {"fields": "id"})
+
+        self.assertEqual(response.data["results"], [{"id": order.id}])
+
+    def test_order_summary_invalidated_on_airport_change(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        self.client.get(ORDER_LIST_URL)
+
+        source = flight.route.source
+        source.name = "KTW"
+        source.save()
+        response = self.client.get(ORDER_LIST_URL)
+
+        self.assertEqual(
+            response.data["results"][0]["tickets"][0]["route"],
+            flight.route.full_route,
+        )
+        self.assertEqual(flight.route.full_route, "KTW - PMI")
+
+    def test_rebuild_order_summaries_command(self):
+        flight = sample_flight()
+        for seat in range(1, 4):
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(row=1, seat=seat, flight=flight, order=order)
+
+        out = StringIO()
+        call_command(
+            "rebuild_order_summaries", "--batch-size", "2", stdout=out
+        )
+
+        summary = OrderSummary.objects.get(order=order)
+        self.assertIn("Rebuilt 3", out.getvalue())
+        self.assertEqual(OrderSummary.objects.count(), 3)
+        self.assertEqual(
+            summary.detail_data, OrderDetailSerializer(order).data
+        )
+
     def test_order_create(self):
         flight = sample_flight()
         ticket_1 = {
@@ -129,6 +304,20 @@ class AuthenticatedOrderAPITests(TestCase):
         self.assertEqual(ticket_2["seat"], tickets[1].seat)
         self.assertEqual(ticket_2["flight"], tickets[1].flight.id)
 
+    def test_order_create_updates_tickets_available(self):
+        flight = sample_flight()
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.pk},
+                {"row": 1, "seat": 2, "flight": flight.pk},
+            ],
+        }
+        response = self.client.post(ORDER_LIST_URL, data, format="json")
+
+        flight.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(flight.tickets_available, 238)
+
     def test_order_create_row_outside_given_range_forbidden(self):
         flight = sample_flight()
         ticket = {
@@ -171,8 +360,222 @@ class AuthenticatedOrderAPITests(TestCase):
             "tickets": [ticket_1, ticket_2],
         }
 
-        with self.assertRaises(ValidationError):
-            self.client.post(ORDER_LIST_URL, data, format="json")
+        response = self.client.post(ORDER_LIST_URL, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn("seat", response.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_order_create_taken_seat_forbidden(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.pk}]}
+
+        response = self.client.post(ORDER_LIST_URL, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", response.data["tickets"][0])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_order_create_group_booking_single_insert(self):
+        flight = sample_flight()
+        data = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": flight.pk}
+                for seat in range(1, 7)
+            ]
+        }
+
+        response = self.client.post(ORDER_LIST_URL, data, format="json")
+
+        flight.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.filter(flight=flight).count(), 6)
+        self.assertEqual(flight.tickets_available, 234)
+        self.assertEqual(flight.get_seat_map().taken_count, 6)
+
+    def test_order_create_query_count_independent_of_ticket_count(self):
+        flight = sample_flight()
+        flights = [
+            flight,
+            Flight.objects.create(
+                route=flight.route,
+                airplane=flight.airplane,
+                departure_time=timezone.now() + timedelta(days=3),
+                arrival_time=timezone.now() + timedelta(days=4),
+            ),
+        ]
+
+        def post_order(row, seats):
+            data = {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.pk}
+                    for seat in range(1, seats + 1)
+                    for flight in flights
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    ORDER_LIST_URL, data, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(post_order(1, 1), post_order(2, 6))
+
+    def test_order_create_throttled_by_booking_rate(self):
+        flight = sample_flight()
+
+        def post_order(seat):
+            data = {"tickets": [{"row": 1, "seat": seat, "flight": flight.pk}]}
+            return self.client.post(ORDER_LIST_URL, data, format="json")
+
+        with mock.patch.dict(
+            ScopedBucketThrottle.THROTTLE_RATES, {"booking": "2/min"}
+        ):
+            for seat in (1, 2):
+                response = post_order(seat)
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = post_order(3)
+            self.assertEqual(
+                response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+            )
+            self.assertGreater(int(response["Retry-After"]), 0)
+
+            response = self.client.get(ORDER_LIST_URL)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertFalse(flight.tickets.filter(seat=3).exists())
+
+    def test_order_create_unknown_flight(self):
+        flight = sample_flight()
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.pk},
+                {"row": 1, "seat": 2, "flight": flight.pk + 100},
+                {"row": 1, "seat": 3, "flight": "x"},
+            ]
+        }
+
+        response = self.client.post(ORDER_LIST_URL, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertEqual(
+            response.data["tickets"][1]["flight"][0].code, "does_not_exist"
+        )
+        self.assertEqual(
+            response.data["tickets"][2]["flight"][0].code, "incorrect_type"
+        )
+
+    def test_order_create_async(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.pk}]}
+
+        response = self.client.post(
+            ORDER_LIST_URL, data, format="json", HTTP_PREFER="respond-async"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertFalse(Order.objects.exists())
+
+        self.assertEqual(process_order_queue(), 1)
+
+        status_response = self.client.get(response["Location"])
+        self.assertEqual(status_response.data["status"], "completed")
+        self.assertEqual(
+            status_response.data["order"]["id"], Order.objects.get().id
+        )
+        self.assertEqual(Ticket.objects.filter(flight=flight).count(), 1)
+
+    def test_order_create_async_invalid_payload(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 100, "seat": 1, "flight": flight.pk}]}
+
+        response = self.client.post(
+            ORDER_LIST_URL, data, format="json", HTTP_PREFER="respond-async"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrderRequest.objects.exists())
+
+    def test_order_queue_reports_conflicts_per_request(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.pk}]}
+        tokens = [
+            self.client.post(
+                ORDER_LIST_URL,
+                data,
+                format="json",
+                HTTP_PREFER="respond-async",
+            ).data["token"]
+            for _ in range(2)
+        ]
+
+        process_order_queue()
+
+        first, second = (
+            OrderRequest.objects.get(token=token) for token in tokens
+        )
+        self.assertEqual(first.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(second.status, OrderRequest.Status.FAILED)
+        self.assertIn("seat", second.errors["tickets"][0])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_order_queue_fails_unexpected_errors_per_request(self):
+        flight = sample_flight()
+        tokens = [
+            self.client.post(
+                ORDER_LIST_URL,
+                {"tickets": [{"row": 1, "seat": seat, "flight": flight.pk}]},
+                format="json",
+                HTTP_PREFER="respond-async",
+            ).data["token"]
+            for seat in (1, 2)
+        ]
+        save = OrderSerializer.save
+
+        def failing_save(serializer, **kwargs):
+            if serializer.initial_data["tickets"][0]["seat"] == 1:
+                raise RuntimeError("booking failed")
+            return save(serializer, **kwargs)
+
+        with mock.patch.object(OrderSerializer, "save", failing_save):
+            with self.assertLogs("airport.order_queue", "ERROR"):
+                self.assertEqual(process_order_queue(), 2)
+
+        first, second = (
+            OrderRequest.objects.get(token=token) for token in tokens
+        )
+        self.assertEqual(first.status, OrderRequest.Status.FAILED)
+        self.assertIn("detail", first.errors)
+        self.assertEqual(second.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_order_request_status_malformed_token_not_found(self):
+        response = self.client.get(ORDER_LIST_URL + "requests/abc/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_request_status_of_other_user_not_found(self):
+        flight = sample_flight()
+        order_request = OrderRequest.objects.create(
+            user=get_user_model().objects.create_user(
+                email="other@test.com", password="test123"
+            ),
+            flight=flight,
+            payload={},
+        )
+
+        response = self.client.get(
+            reverse(
+                "airport:order-request-status",
+                kwargs={"token": order_request.token},
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_order_create_for_past_flights_forbidden(self):
         flight = sample_flight(
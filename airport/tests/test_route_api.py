@@ -65,6 +65,36 @@ class AuthenticatedRouteAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_route_list_served_from_route_graph(self):
+        sample_route()
+        self.client.get(ROUTE_LIST_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ROUTE_LIST_URL)
+        self.assertEqual(len(response.data), 1)
+
+    def test_route_list_after_route_and_airport_changes(self):
+        route = sample_route()
+        self.client.get(ROUTE_LIST_URL)
+
+        sample_route(
+            source=route.destination,
+            destination=route.source,
+            distance=1000
+        )
+        airport = route.source
+        airport.name = "Renamed"
+        airport.save()
+
+        response = self.client.get(ROUTE_LIST_URL)
+        serializer = RouteListSerializer(
+            Route.objects.order_by("id"), many=True
+        )
+        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(
+            response.data[0]["full_route"], "Renamed - Sample_name_1"
+        )
+
     def test_route_retrieve(self):
         route = sample_route()
         response = self.client.get(ROUTE_DETAIL_URL)
@@ -0,0 +1,62 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.schema import generate_schema, schema_cache
+
+SCHEMA_URL = reverse("schema")
+
+
+class SchemaAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        schema_cache.clear()
+
+    def tearDown(self):
+        schema_cache.clear()
+
+    def test_schema_matches_generated_schema(self):
+        response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["Content-Type"], "application/vnd.oai.openapi+json"
+        )
+        self.assertEqual(
+            json.loads(response.content),
+            json.loads(json.dumps(generate_schema())),
+        )
+
+    def test_schema_conditional_get(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        response = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+        json_response = self.client.get(
+            SCHEMA_URL, {"format": "json"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(json_response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(json_response["ETag"], etag)
+
+    def test_regenerate_schema_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            schema_file = Path(directory) / "schema.json"
+            with override_settings(SCHEMA_FILE=str(schema_file)):
+                call_command("regenerate_schema", stdout=StringIO())
+                schema = json.loads(schema_file.read_text())
+                schema["info"]["title"] = "Cached"
+                schema_file.write_text(json.dumps(schema))
+
+                response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(json.loads(response.content)["info"]["title"],
+                         "Cached")
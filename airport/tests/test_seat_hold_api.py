@@ -0,0 +1,227 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    SeatHold,
+)
+
+SEAT_HOLD_URL = reverse("airport:seathold-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def seat_hold_detail_url(seat_hold_id):
+    return reverse("airport:seathold-detail", args=[seat_hold_id])
+
+
+def sample_flight():
+    source = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+    destination = Airport.objects.create(
+        name="Heathrow", closest_big_city="London"
+    )
+    route = Route.objects.create(
+        source=source, destination=destination, distance=2000
+    )
+    airplane = Airplane.objects.create(
+        name="Boeing 737",
+        rows=10,
+        seats_in_row=4,
+        airplane_type=AirplaneType.objects.create(name="Boeing"),
+    )
+    departure_time = timezone.now() + timedelta(days=1)
+    return Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=3),
+    )
+
+
+class UnauthenticatedSeatHoldAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        response = self.client.get(SEAT_HOLD_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test123",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@test.com",
+            password="test123",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def hold(self, *seats, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            SEAT_HOLD_URL,
+            {
+                "flight": self.flight.id,
+                "seats": [{"row": row, "seat": seat} for row, seat in seats],
+            },
+            format="json",
+        )
+
+    def book(self, *seats, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_hold_seats(self):
+        response = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(hold["row"], hold["seat"]) for hold in response.data],
+            [(1, 1), (1, 2)],
+        )
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(), 2
+        )
+
+    def test_hold_too_many_seats(self):
+        response = self.hold(
+            *[(1, seat) for seat in range(1, 5)],
+            *[(2, seat) for seat in range(1, 5)],
+            *[(3, seat) for seat in range(1, 3)],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seats", response.data)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_hold_seat_held_by_other_user(self):
+        self.hold((1, 1), user=self.other_user)
+
+        response = self.hold((1, 2), (1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["seats"][0], {})
+        self.assertIn("seat", response.data["seats"][1])
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_hold_seat_again_extends_expiry(self):
+        self.hold((1, 1))
+        SeatHold.objects.update(
+            expires_at=timezone.now() + timedelta(seconds=5)
+        )
+
+        response = self.hold((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.count(), 1)
+        self.assertGreater(
+            SeatHold.objects.get().expires_at,
+            timezone.now() + timedelta(minutes=1),
+        )
+
+    def test_expired_hold_can_be_taken(self):
+        self.hold((1, 1), user=self.other_user)
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.hold((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_hold_taken_seat(self):
+        self.book((2, 3), user=self.other_user)
+
+        response = self.hold((2, 3))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", response.data["seats"][0])
+
+    def test_book_seat_held_by_other_user(self):
+        self.hold((1, 1), user=self.other_user)
+
+        response = self.book((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", response.data["tickets"][0])
+
+    def test_booking_releases_own_holds(self):
+        self.hold((1, 1), (1, 2))
+
+        response = self.book((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(SeatHold.objects.values_list("row", "seat")), [(1, 2)]
+        )
+
+    def test_list_own_active_holds(self):
+        self.hold((1, 1), user=self.other_user)
+        self.hold((1, 2), (1, 3))
+        SeatHold.objects.filter(seat=3).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(hold["row"], hold["seat"]) for hold in response.data],
+            [(1, 2)],
+        )
+
+    def test_release_hold(self):
+        hold_id = self.hold((1, 1)).data[0]["id"]
+
+        response = self.client.delete(seat_hold_detail_url(hold_id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_other_user_hold_not_found(self):
+        hold_id = self.hold((1, 1), user=self.other_user).data[0]["id"]
+        self.client.force_authenticate(self.user)
+
+        response = self.client.delete(seat_hold_detail_url(hold_id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sweep_seat_holds(self):
+        self.hold((1, 1), (1, 2))
+        SeatHold.objects.filter(seat=1).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        call_command(
+            "sweep_seat_holds", "--batch-size", "1", stdout=StringIO()
+        )
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("row", "seat")), [(1, 2)]
+        )
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from airport.throttling import BucketThrottleMixin, token_leases
+
+
+class QueryCountMixin:
+    """Assertions on the number of queries run by a request"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Every request takes its own token from the bucket, instead of
+        # some requests leasing tokens and others using them up
+        token_leases.clear()
+        cls.enterClassContext(
+            mock.patch.object(BucketThrottleMixin, "lease_fraction", 0)
+        )
+
+    def assertConstantQueries(self, add_items, fetch, sizes=(1, 2, 4)):
+        """Grow the data and check ``fetch`` runs as many queries each time.
+
+        ``add_items(count)`` creates ``count`` more items and ``fetch()``
+        runs the code under test; ``sizes`` are the item totals to
+        measure at.
+        """
+        counts = {}
+        total = 0
+        for size in sizes:
+            add_items(size - total)
+            total = size
+            with CaptureQueriesContext(connection) as queries:
+                fetch()
+            counts[size] = len(queries)
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"Query count grows with the number of items: {counts}",
+        )
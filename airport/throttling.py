@@ -0,0 +1,217 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    UserRateThrottle,
+)
+
+from airport.models import ThrottleBucket
+
+_NOW = "EXTRACT(EPOCH FROM statement_timestamp())::float8"
+
+# A bucket with ``num_requests`` tokens refilling over ``duration`` is
+# full at ``full_at``. Taking ``count`` tokens moves that time
+# ``count * interval`` on, which is allowed while it stays within
+# ``duration`` from now; denied requests leave the row alone and return
+# nothing.
+TAKE_TOKENS_SQL = f"""
+    INSERT INTO {ThrottleBucket._meta.db_table} AS bucket (key, full_at)
+    VALUES (%(key)s, {_NOW} + %(taken)s)
+    ON CONFLICT (key) DO UPDATE
+    SET full_at = GREATEST(bucket.full_at, {_NOW}) + %(taken)s
+    WHERE GREATEST(bucket.full_at, {_NOW}) + %(taken)s
+          <= {_NOW} + %(duration)s
+    RETURNING full_at
+"""
+
+WAIT_SQL = f"""
+    SELECT full_at + %(interval)s - %(duration)s - {_NOW}
+    FROM {ThrottleBucket._meta.db_table}
+    WHERE key = %(key)s
+"""
+
+MAX_KEY_LENGTH = ThrottleBucket._meta.get_field("key").max_length
+
+
+def _bucket_key(key):
+    if len(key) > MAX_KEY_LENGTH:
+        return hashlib.sha256(key.encode()).hexdigest()
+    return key
+
+
+def take_tokens(key, count, num_requests, duration) -> bool:
+    """Take ``count`` tokens from a shared bucket in one upsert.
+
+    Time comes from the database clock, so every worker agrees on it.
+    """
+    if count > num_requests:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TAKE_TOKENS_SQL,
+            {
+                "key": _bucket_key(key),
+                "taken": count * duration / num_requests,
+                "duration": duration,
+            },
+        )
+        return cursor.fetchone() is not None
+
+
+def token_wait(key, num_requests, duration) -> float:
+    """Seconds until the next token of a bucket"""
+    if num_requests <= 0:
+        return duration
+    with connection.cursor() as cursor:
+        cursor.execute(
+            WAIT_SQL,
+            {
+                "key": _bucket_key(key),
+                "interval": duration / num_requests,
+                "duration": duration,
+            },
+        )
+        row = cursor.fetchone()
+    return max(row[0], 0.0) if row else 0.0
+
+
+def sweep_full_buckets():
+    """Delete buckets that refilled, returning how many were removed.
+
+    A full bucket behaves exactly like a missing one.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {ThrottleBucket._meta.db_table} "
+            f"WHERE full_at <= {_NOW}"
+        )
+        return cursor.rowcount
+
+
+class TokenLeases:
+    """Process-local tokens taken ahead from shared buckets.
+
+    Unused tokens lapse once the bucket would have refilled them, so a
+    worker never holds on to more than one lease per key.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if entry[0] <= 0 or entry[1] <= time.monotonic():
+                del self._entries[key]
+                return False
+            entry[0] -= 1
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, key, tokens, ttl):
+        with self._lock:
+            self._entries[key] = [tokens, time.monotonic() + ttl]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_leases = TokenLeases(
+    getattr(settings, "THROTTLE_LEASE_MAX_ENTRIES", 10000)
+)
+
+
+class BucketThrottleMixin:
+    """SimpleRateThrottle counting requests in ThrottleBucket.
+
+    Buckets live in PostgreSQL, so the rate holds across all workers,
+    and each check is at most a constant-time upsert instead of a
+    request history kept in the cache. A rate of ``num_requests`` per
+    ``duration`` is a bucket of that many tokens refilling steadily: a
+    full bucket allows a burst of ``num_requests`` at once, so up to
+    about twice the rate can pass within one ``duration`` window, while
+    the long-run average stays at the rate. Workers take
+    ``lease_fraction`` of the rate at once and serve it locally, so a
+    worker may also deny up to one lease early.
+    """
+
+    lease_fraction = 0.01
+    wait_seconds = None
+
+    def get_lease_size(self):
+        return max(1, int(self.num_requests * self.lease_fraction))
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        if token_leases.take(self.key):
+            return True
+        lease = self.get_lease_size()
+        if take_tokens(self.key, lease, self.num_requests, self.duration):
+            if lease > 1:
+                token_leases.add(
+                    self.key,
+                    lease - 1,
+                    lease * self.duration / self.num_requests,
+                )
+            return True
+        if lease > 1 and take_tokens(
+            self.key, 1, self.num_requests, self.duration
+        ):
+            return True
+
+        self.wait_seconds = token_wait(
+            self.key, self.num_requests, self.duration
+        )
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonBucketThrottle(BucketThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class UserBucketThrottle(BucketThrottleMixin, UserRateThrottle):
+    pass
+
+
+class ScopedBucketThrottle(BucketThrottleMixin, ScopedRateThrottle):
+    """Per-endpoint rates from DEFAULT_THROTTLE_RATES.
+
+    ``throttle_scopes`` on a view maps actions to scopes, ex.
+    {"create": "booking"}; ``throttle_scope`` applies to every action.
+    Views without a scope are not limited by this throttle.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scopes", {}).get(
+            getattr(view, "action", None),
+            getattr(view, self.scope_attr, None),
+        )
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
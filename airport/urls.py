@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework import routers
 
+from airport.async_views import (
+    AsyncAirportView,
+    AsyncFlightView,
+    AsyncRouteView,
+)
 from airport.views import (
     AirplaneTypeViewSet,
     CrewViewSet,
@@ -8,7 +14,9 @@ from airport.views import (
     AirportViewSet,
     RouteViewSet,
     FlightViewSet,
+    ItineraryViewSet,
     OrderViewSet,
+    SeatHoldViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -18,8 +26,42 @@ router.register("airplanes", AirplaneViewSet)
 router.register("airports", AirportViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet)
+router.register("itineraries", ItineraryViewSet, basename="itinerary")
 router.register("orders", OrderViewSet)
+router.register("seat_holds", SeatHoldViewSet)
+
+
+def async_read_urlpatterns(prefix, view_class, basename):
+    """Serve the list and detail routes of a registered viewset async"""
+    return [
+        path(
+            f"{prefix}/",
+            view_class.as_view(
+                actions={"get": "list", "post": "create"},
+                basename=basename,
+            ),
+            name=f"{basename}-list",
+        ),
+        path(
+            f"{prefix}/<int:pk>/",
+            view_class.as_view(
+                actions={"get": "retrieve"},
+                basename=basename,
+                detail=True,
+            ),
+            name=f"{basename}-detail",
+        ),
+    ]
+
+
+async_urlpatterns = (
+    async_read_urlpatterns("airports", AsyncAirportView, "airport")
+    + async_read_urlpatterns("routes", AsyncRouteView, "route")
+    + async_read_urlpatterns("flights", AsyncFlightView, "flight")
+)
 
 urlpatterns = [path("", include(router.urls))]
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_urlpatterns + urlpatterns
 
 app_name = "airport"
@@ -0,0 +1,96 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(name):
+    return f"airport:version:{name}"
+
+
+def get_versions(*names) -> tuple:
+    """Return the current version counters of named pieces of data.
+
+    Counters live in the default cache, so every process sharing that
+    cache sees the same versions, and are read in one round trip. A
+    missing counter is seeded from the clock so it never goes back to a
+    value seen before an eviction; ``add`` keeps a counter another
+    process seeded or bumped in the meantime.
+    """
+    keys = [_version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return tuple(versions[key] for key in keys)
+
+
+async def aget_versions(*names) -> tuple:
+    """get_versions for async code, without blocking the event loop"""
+    keys = [_version_key(name) for name in names]
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+        versions.update(await cache.aget_many(missing))
+    return tuple(versions[key] for key in keys)
+
+
+def get_version(name) -> int:
+    return get_versions(name)[0]
+
+
+class RequestVersionsMixin:
+    """Read every version counter a view needs once per request.
+
+    Mixins add the names they use in ``get_request_version_names``;
+    ``request_versions`` reads all of them together on first use and
+    answers later lookups from that snapshot.
+    """
+
+    def get_request_version_names(self):
+        return ()
+
+    def request_versions(self, *names) -> tuple:
+        versions = getattr(self, "_request_versions", None)
+        if versions is None:
+            all_names = dict.fromkeys(self.get_request_version_names())
+            versions = self._request_versions = dict(
+                zip(all_names, get_versions(*all_names))
+            )
+        missing = [name for name in names if name not in versions]
+        if missing:
+            versions.update(zip(missing, get_versions(*missing)))
+        return tuple(versions[name] for name in names)
+
+
+def _increment(name):
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_version(name):
+    """Invalidate everything derived from the named data.
+
+    The counter is bumped right away and once more after the current
+    transaction commits, so a reader that rebuilt from uncommitted state
+    in between cannot keep serving it.
+    """
+    _increment(name)
+    transaction.on_commit(lambda: _increment(name))
+
+
+def object_version_names(name, pk) -> tuple:
+    """Counters behind a single object: its own and the all-objects one"""
+    return f"{name}:{pk}", f"{name}:*"
+
+
+def bump_object_version(name, pk=None):
+    """Invalidate one object of the named data, or all of them"""
+    bump_version(f"{name}:{'*' if pk is None else pk}")
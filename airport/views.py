@@ -1,10 +1,52 @@
-from django.db.models import F, Count
+from datetime import datetime, time, timedelta
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import mixins
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import mixins, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 
+from airport.conditional import ConditionalGetMixin
+from airport.exports import (
+    FLIGHT_COLUMNS,
+    ORDER_COLUMNS,
+    export_response,
+    flight_export_rows,
+    order_export_rows,
+    output_parameter,
+)
+from airport.fast_lists import (
+    AIRPLANE_LIST,
+    FLIGHT_LIST,
+    ROUTE_LIST,
+    FastListMixin,
+)
+from airport.itineraries import search_itineraries
+from airport.order_queue import enqueue_order
+from airport.order_summaries import (
+    build_order_summaries,
+    get_order_summaries,
+)
+from airport.response_cache import CachedResponseMixin, response_cache
+from airport.route_graph import get_route_graph
+from airport.schedule_import import (
+    FlightImportSerializer,
+    import_schedule,
+    read_schedule,
+)
+from airport.query_planning import QueryPlanningMixin
+from airport.seat_assignment import assign_seats
+from airport.sparse_fields import SparseFieldsMixin
+from airport.versions import object_version_names
+
 from airport.models import (
     Airport,
     Route,
@@ -12,7 +54,15 @@ from airport.models import (
     AirplaneType,
     Airplane,
     Flight,
-    Order
+    Order,
+    OrderRequest,
+    SeatHold,
+)
+from airport.pagination import (
+    CursorPaginationMixin,
+    FlightCursorPagination,
+    OrderCursorPagination,
+    StandardResultsSetPagination,
 )
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
 from airport.serializers import (
@@ -31,11 +81,19 @@ from airport.serializers import (
     OrderSerializer,
     OrderListSerializer,
     OrderDetailSerializer,
+    OrderRequestSerializer,
     CrewListSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
+    SeatAssignmentSerializer,
 )
 
 
 class AirportViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
@@ -44,6 +102,7 @@ class AirportViewSet(
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    etag_versions = ("airport",)
 
 
 def _params_to_ints(qs):
@@ -51,19 +110,59 @@ def _params_to_ints(qs):
     return [int(str_id) for str_id in qs.split(",")]
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 5
-    max_page_size = 100
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _param_to_date(value, param_name):
+    """Converts a date string to a date"""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError(
+            {param_name: "Enter a valid date, ex. 2024-01-01"}
+        )
+    return day
+
+
+def _param_to_datetime(value, param_name):
+    """Converts a date or datetime string to an aware datetime.
+
+    A plain date is read as the start of that day in the current timezone.
+    """
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        try:
+            return _day_start(_param_to_date(value, param_name))
+        except ValidationError:
+            raise ValidationError(
+                {param_name: "Enter a valid date or date/time, "
+                             "ex. 2024-01-01 or 2024-01-01T10:00:00Z"}
+            )
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 
 class RouteViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    QueryPlanningMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
-    queryset = Route.objects.select_related("source", "destination")
+    queryset = Route.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    etag_versions = ("route", "airport")
+    fast_list = ROUTE_LIST
 
     def get_queryset(self):
         source = self.request.query_params.get("source")
@@ -88,6 +187,36 @@ class RouteViewSet(
             return RouteDetailSerializer
         return RouteSerializer
 
+    def get_route_list(self, route_graph=None):
+        """Filter the in-memory route graph instead of querying routes"""
+        source = self.request.query_params.get("source")
+        destination = self.request.query_params.get("destination")
+
+        routes = (route_graph or get_route_graph()).all_routes()
+
+        if source:
+            source_ids = set(_params_to_ints(source))
+            routes = [
+                route for route in routes if route.source_id in source_ids
+            ]
+
+        if destination:
+            destination_ids = set(_params_to_ints(destination))
+            routes = [
+                route for route in routes
+                if route.destination_id in destination_ids
+            ]
+
+        return routes
+
+    def get_route_list_data(self, routes):
+        if self.fast_list is None:
+            return self.get_serializer(routes, many=True).data
+        to_representation = self.fast_list.row_function(
+            self.get_fast_list_fields()
+        )
+        return [to_representation(route._asdict()) for route in routes]
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -105,12 +234,13 @@ class RouteViewSet(
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(self, request, *args, **kwargs)
+        return Response(self.get_route_list_data(self.get_route_list()))
 
 
-class CrewViewSet(ModelViewSet):
+class CrewViewSet(ConditionalGetMixin, SparseFieldsMixin, ModelViewSet):
     queryset = Crew.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    etag_versions = ("crew",)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -119,6 +249,8 @@ class CrewViewSet(ModelViewSet):
 
 
 class AirplaneTypeViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
@@ -127,16 +259,23 @@ class AirplaneTypeViewSet(
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    etag_versions = ("airplane_type",)
 
 
 class AirplaneViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    QueryPlanningMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
-    queryset = Airplane.objects.select_related("airplane_type")
+    queryset = Airplane.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    etag_versions = ("airplane", "airplane_type")
+    fast_list = AIRPLANE_LIST
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -146,36 +285,107 @@ class AirplaneViewSet(
         return AirplaneSerializer
 
 
+FLIGHT_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        name="date",
+        description="Filter by departure date, ex. 2024-01-01",
+        required=False,
+        type=str,
+    ),
+    OpenApiParameter(
+        name="departure_after",
+        description="Filter by departure at or after the given "
+                    "date or date/time, ex. 2024-01-01 "
+                    "or 2024-01-01T10:00:00Z",
+        required=False,
+        type=str,
+    ),
+    OpenApiParameter(
+        name="departure_before",
+        description="Filter by departure before the given "
+                    "date or date/time, ex. 2024-01-01 "
+                    "or 2024-01-01T10:00:00Z",
+        required=False,
+        type=str,
+    ),
+    OpenApiParameter(
+        name="source",
+        description="Filter by departure airport id",
+        required=False,
+        type=str,
+    ),
+    OpenApiParameter(
+        name="destination",
+        description="Filter by destination airport id",
+        required=False,
+        type=str,
+    ),
+]
+
+
 class FlightViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    QueryPlanningMixin,
+    CachedResponseMixin,
+    CursorPaginationMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
-    queryset = (
-        Flight.objects.select_related("route", "airplane")
-        .prefetch_related("crew")
-        .order_by("departure_time", "arrival_time")
-        .annotate(
-            tickets_available=(
-                F("airplane__rows")
-                * F("airplane__seats_in_row")
-                - Count("tickets")
-            )
-        )
-    )
+    queryset = Flight.objects.order_by("departure_time", "arrival_time")
     pagination_class = StandardResultsSetPagination
+    cursor_pagination_class = FlightCursorPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_versions = (
+        "flight", "ticket", "route", "airport", "airplane", "crew"
+    )
+    etag_versions = cache_versions
+    fast_list = FLIGHT_LIST
+    throttle_scopes = {"assign_seats": "booking", "export": "export"}
+
+    def get_etag_versions(self):
+        if self.action == "retrieve":
+            return (
+                *object_version_names("flight", self.kwargs["pk"]),
+                "route",
+                "airport",
+                "airplane",
+                "crew",
+            )
+        return self.etag_versions
 
     def get_queryset(self):
         departure_date = self.request.query_params.get("date")
+        departure_after = self.request.query_params.get("departure_after")
+        departure_before = self.request.query_params.get("departure_before")
         source = self.request.query_params.get("source")
         destination = self.request.query_params.get("destination")
 
         queryset = self.queryset
 
         if departure_date:
-            queryset = queryset.filter(departure_time__date=departure_date)
+            day = _param_to_date(departure_date, "date")
+            queryset = queryset.filter(
+                departure_time__gte=_day_start(day),
+                departure_time__lt=_day_start(day + timedelta(days=1)),
+            )
+
+        if departure_after:
+            queryset = queryset.filter(
+                departure_time__gte=_param_to_datetime(
+                    departure_after, "departure_after"
+                )
+            )
+
+        if departure_before:
+            queryset = queryset.filter(
+                departure_time__lt=_param_to_datetime(
+                    departure_before, "departure_before"
+                )
+            )
 
         if source:
             source_ids = _params_to_ints(source)
@@ -187,7 +397,7 @@ class FlightViewSet(
                 route__destination__id__in=destination_ids
             )
 
-        return queryset.distinct()
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -196,48 +406,229 @@ class FlightViewSet(
             return FlightDetailSerializer
         return FlightSerializer
 
+    @extend_schema(
+        parameters=[
+            *FLIGHT_FILTER_PARAMETERS,
+            CursorPaginationMixin.pagination_parameter,
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
-                name="date",
-                description="Filter by departure date, ex. 2024-01-01",
-                required=False,
-                type=str,
-            ),
-            OpenApiParameter(
-                name="source",
-                description="Filter by departure airport id",
-                required=False,
-                type=str,
-            ),
-            OpenApiParameter(
-                name="destination",
-                description="Filter by destination airport id",
+                name="seats",
+                description="Use 'list' to also get taken places "
+                            "as a list of tickets instead of "
+                            "the seat map only",
                 required=False,
                 type=str,
             ),
         ]
     )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        request={
+            "application/json": FlightImportSerializer(many=True),
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"}
+                },
+            },
+        },
+        responses={201: OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=(IsAdminUser,),
+        parser_classes=(JSONParser, MultiPartParser),
+        url_path="import",
+    )
+    def import_schedule(self, request):
+        """Create many flights from a JSON list or a CSV/JSON file"""
+        upload = request.FILES.get("file")
+        if upload:
+            file_format = upload.name.rsplit(".", 1)[-1].lower()
+            rows = read_schedule(upload.read(), file_format)
+        else:
+            rows = request.data
+            if isinstance(rows, dict):
+                rows = rows.get("flights")
+            if not isinstance(rows, list):
+                raise ValidationError(
+                    {"flights": "Expected a list of flights."}
+                )
+
+        flights = import_schedule(rows)
+        return Response(
+            {
+                "created": len(flights),
+                "ids": [flight.id for flight in flights],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        request=SeatAssignmentSerializer,
+        responses={201: OrderSerializer},
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=(IsAuthenticated,),
+        url_path="assign-seats",
+    )
+    def assign_seats(self, request, pk=None):
+        """Book the given number of seats, seated together if possible"""
+        serializer = SeatAssignmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = assign_seats(
+            request.user, self.get_object(), serializer.validated_data["count"]
+        )
+        build_order_summaries([order.id])
+        return Response(
+            OrderSerializer(order).data, status=status.HTTP_201_CREATED
+        )
+
+    @extend_schema(
+        parameters=[
+            output_parameter,
+            *FLIGHT_FILTER_PARAMETERS,
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR,
+                   (200, "text/csv"): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream all matching flights with capacity and free seats"""
+        return export_response(
+            request,
+            flight_export_rows(self.get_queryset()),
+            FLIGHT_COLUMNS,
+            "flights",
+        )
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=(IsAdminUser,),
+        url_path="cache-stats",
+    )
+    def cache_stats(self, request):
+        """Hit/miss statistics of this worker's response cache"""
+        return Response(response_cache.stats())
+
+
+class ItineraryViewSet(
+    ConditionalGetMixin, SparseFieldsMixin, GenericViewSet
+):
+    serializer_class = ItinerarySerializer
+    permission_classes = (IsAuthenticated,)
+    etag_versions = ("flight", "route", "airport", "airplane", "crew")
+
+    @extend_schema(parameters=[ItinerarySearchSerializer])
     def list(self, request, *args, **kwargs):
-        return super().list(self, request, *args, **kwargs)
+        search = ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        itineraries = search_itineraries(
+            source=params["source"].id,
+            destination=params["destination"].id,
+            departure_from=_day_start(params["date"]),
+            min_connection=timedelta(minutes=params["min_connection"]),
+            max_duration=timedelta(minutes=params["max_duration"]),
+            max_legs=params["max_legs"],
+            limit=params["limit"],
+        )
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data)
+
+
+class SeatHoldViewSet(
+    SparseFieldsMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "booking"}
+
+    def get_queryset(self):
+        return SeatHold.objects.filter(
+            user=self.request.user, expires_at__gt=timezone.now()
+        ).order_by("expires_at", "flight_id", "row", "seat")
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return SeatHoldCreateSerializer
+        return SeatHoldSerializer
+
+    @extend_schema(responses=SeatHoldSerializer(many=True))
+    def create(self, request, *args, **kwargs):
+        """Hold seats of a flight for settings.SEAT_HOLD_TTL"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = serializer.save(user=request.user)
+        return Response(
+            SeatHoldSerializer(holds, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
 
 
 class OrderViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    CursorPaginationMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
-    queryset = Order.objects.prefetch_related(
-        "tickets__flight__route",
-        "tickets__flight__airplane",
-        "tickets__flight__crew"
-    )
+    queryset = Order.objects.select_related("summary")
     pagination_class = StandardResultsSetPagination
+    cursor_pagination_class = OrderCursorPagination
     permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "booking", "export": "export"}
+    etag_versions = (
+        "ticket", "flight", "route", "airport", "airplane", "crew"
+    )
+    etag_per_user = True
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return self.queryset.filter(user=self.request.user)
+
+    def get_summary_serializer(self, instance, many=False):
+        """Serializer that reads orders from their OrderSummary rows"""
+        context = self.get_serializer_context()
+        context["order_summaries"] = get_order_summaries(
+            instance if many else [instance]
+        )
+        return self.get_serializer(instance, many=many, context=context)
+
+    @extend_schema(parameters=[CursorPaginationMixin.pagination_parameter])
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_summary_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_summary_serializer(list(queryset), many=True)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_summary_serializer(self.get_object())
+        return Response(serializer.data)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -246,5 +637,70 @@ class OrderViewSet(
             return OrderDetailSerializer
         return OrderSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="Prefer",
+                description="Send 'respond-async' to queue the order and "
+                            "poll its status by the returned token",
+                required=False,
+                type=str,
+                location=OpenApiParameter.HEADER,
+            ),
+        ],
+        responses={201: OrderSerializer, 202: OrderRequestSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        if "respond-async" not in request.headers.get("Prefer", ""):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order_request = enqueue_order(request.user, serializer)
+        location = reverse(
+            "airport:order-request-status",
+            kwargs={"token": order_request.token},
+            request=request,
+        )
+        return Response(
+            OrderRequestSerializer(order_request).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": location},
+        )
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        order = serializer.save(user=self.request.user)
+        build_order_summaries([order.id])
+
+    @extend_schema(
+        parameters=[output_parameter],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR,
+                   (200, "text/csv"): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream the tickets of all orders of the user"""
+        return export_response(
+            request,
+            order_export_rows(request.user),
+            ORDER_COLUMNS,
+            "orders",
+        )
+
+    @extend_schema(responses=OrderRequestSerializer)
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=(
+            r"requests/(?P<token>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}"
+            r"-[0-9a-f]{4}-[0-9a-f]{12})"
+        ),
+    )
+    def request_status(self, request, token=None):
+        """Status of a queued order and the order once it is booked"""
+        order_request = get_object_or_404(
+            OrderRequest.objects.select_related("order"),
+            token=token,
+            user=request.user,
+        )
+        return Response(OrderRequestSerializer(order_request).data)
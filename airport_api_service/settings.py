@@ -81,17 +81,20 @@ WSGI_APPLICATION = "airport_api_service.wsgi.application"
 
 REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "airport.throttling.AnonBucketThrottle",
+        "airport.throttling.UserBucketThrottle",
+        "airport.throttling.ScopedBucketThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
-        "user": "1000/day"
+        "user": "1000/day",
+        "booking": "30/min",
+        "export": "10/hour",
     },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_SCHEMA_CLASS": "airport.openapi.AutoSchema",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -107,6 +110,46 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Data version counters (response cache, route graph, ETags, auth cache)
+# live in the default cache; every worker must share it, so set REDIS_URL
+# whenever more than one process serves the API
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+        if os.environ.get("REDIS_URL")
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
+RESPONSE_CACHE_MAX_ENTRIES = int(
+    os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+)
+
+# Validated access tokens and their users kept per worker (0 disables)
+AUTH_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_CACHE_MAX_ENTRIES", 4096))
+
+# Throttle tokens leased per worker, by throttle key
+THROTTLE_LEASE_MAX_ENTRIES = int(
+    os.environ.get("THROTTLE_LEASE_MAX_ENTRIES", 10000)
+)
+
+# Serve flight, route and airport reads with async views (run under ASGI)
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "False") == "True"
+
+SEAT_HOLD_TTL = timedelta(
+    minutes=int(os.environ.get("SEAT_HOLD_TTL_MINUTES", 10))
+)
+
+# Seats a single hold or seat assignment request may take
+MAX_SEATS_PER_REQUEST = int(os.environ.get("MAX_SEATS_PER_REQUEST", 9))
+
+# OpenAPI schema written by `manage.py regenerate_schema`; without it the
+# schema is generated once per process
+SCHEMA_FILE = os.environ.get("SCHEMA_FILE")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -0,0 +1,57 @@
+"""
+API-only settings for airport_api_service.
+
+Workers that only serve /api/airport/ and /api/user/ run with
+DJANGO_SETTINGS_MODULE=airport_api_service.settings_api. Admin, sessions,
+messages, static files, the browsable API and the OpenAPI schema views are
+left out, so their apps, middleware and URLs are not loaded. Serve the
+admin and the API documentation from processes using the default settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+API_ONLY_EXCLUDED_APPS = (
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "drf_spectacular",
+)
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED_APPS
+]
+
+# Authentication comes from the JWT header, which DRF reads itself
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware not in (
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+    )
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+            ],
+        },
+    },
+]
+
+ROOT_URLCONF = "airport_api_service.urls_api"
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
+    # @extend_schema builds on the default schema class when views are
+    # imported; DRF's base inspector keeps drf_spectacular's generator
+    # out (its utils and types are still imported by the views)
+    "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.inspectors.ViewInspector",
+}
@@ -18,16 +18,19 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView
 )
 
+from airport.schema import CachedSpectacularAPIView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/airport/", include("airport.urls", namespace="airport")),
     path("api/user/", include("user.urls", namespace="user")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path(
+        "api/schema/", CachedSpectacularAPIView.as_view(), name="schema"
+    ),
     path(
         "api/schema/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -0,0 +1,11 @@
+"""
+URL configuration of the API-only settings (settings_api): the API
+without the admin and the schema views.
+"""
+
+from django.urls import path, include
+
+urlpatterns = [
+    path("api/airport/", include("airport.urls", namespace="airport")),
+    path("api/user/", include("user.urls", namespace="user")),
+]
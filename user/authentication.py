@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from airport.versions import get_versions, object_version_names
+
+# Columns kept in a cached user; any other field is loaded from the
+# database if it is read
+SNAPSHOT_FIELDS = ("id", "is_active", "is_staff", "is_superuser")
+
+
+def user_snapshot(user) -> dict:
+    """SNAPSHOT_FIELDS of a user, in model field order"""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname in SNAPSHOT_FIELDS
+    }
+
+
+def snapshot_user(snapshot):
+    """User instance of a snapshot, with the other fields deferred"""
+    user_model = get_user_model()
+    return user_model.from_db(
+        user_model.objects.db, list(snapshot), list(snapshot.values())
+    )
+
+
+class TokenUserCache:
+    """Process-local LRU of validated access tokens and their users.
+
+    An entry lives until its token expires and is dropped once the
+    user's version counter changes, which happens on every save or
+    delete of the user (ManageUserView, the admin, set_password...).
+    Other workers only see that change through a shared cache backend;
+    with a process-local one they drop the entry when the token expires.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        """Validated token and user snapshot of a raw token, or None"""
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                return None
+            self._entries.move_to_end(raw_token)
+
+        validated_token, snapshot, versions = entry
+        if validated_token["exp"] <= time.time() or versions != get_versions(
+            *object_version_names("user", snapshot["id"])
+        ):
+            with self._lock:
+                self._entries.pop(raw_token, None)
+            return None
+        return validated_token, snapshot
+
+    def set(self, raw_token, validated_token, snapshot, versions):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[raw_token] = (validated_token, snapshot, versions)
+            self._entries.move_to_end(raw_token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_user_cache = TokenUserCache(
+    getattr(settings, "AUTH_CACHE_MAX_ENTRIES", 4096)
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that skips token decoding and the user query
+    for tokens seen before.
+
+    request.user is then a User holding only SNAPSHOT_FIELDS, enough for
+    permissions and for filtering or assigning by user. Views that
+    change the user (ManageUserView) keep JWTAuthentication.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        cached = token_user_cache.get(raw_token)
+        if cached is not None:
+            validated_token, snapshot = cached
+            return snapshot_user(snapshot), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        # Read before the user, so a save in between is never cached
+        versions = get_versions(
+            *object_version_names(
+                "user", validated_token.get(api_settings.USER_ID_CLAIM)
+            )
+        )
+        user = self.get_user(validated_token)
+        token_user_cache.set(
+            raw_token, validated_token, user_snapshot(user), versions
+        )
+        return user, validated_token
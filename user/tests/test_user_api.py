@@ -2,8 +2,11 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 
+from user.authentication import CachedJWTAuthentication, token_user_cache
 from user.serializers import UserSerializer
 
 USER_CREATE_URL = reverse("user:create")
@@ -48,6 +51,18 @@ class AuthenticatedUserAPITests(TestCase):
                          status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_user_retrieve_conditional_get(self):
+        etag = self.client.get(USER_MANAGE_URL)["ETag"]
+
+        response = self.client.get(USER_MANAGE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(USER_MANAGE_URL, {"email": "test_new@test.com"})
+        response = self.client.get(USER_MANAGE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "test_new@test.com")
+
     def test_user_update(self):
         data = {
             "email": "test_new@test.com",
@@ -74,3 +89,43 @@ class AuthenticatedUserAPITests(TestCase):
         response = self.client.delete(USER_MANAGE_URL)
         self.assertEqual(response.status_code,
                          status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        token_user_cache.clear()
+        self.addCleanup(token_user_cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email="cached@test.com",
+            password="test123",
+        )
+        self.request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.authentication = CachedJWTAuthentication()
+
+    def test_authenticate_reuses_cached_user(self):
+        with self.assertNumQueries(1):
+            user, token = self.authentication.authenticate(self.request)
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.authentication.authenticate(
+                self.request
+            )
+
+        self.assertEqual(cached_user, self.user)
+        self.assertTrue(cached_user.is_authenticated)
+        self.assertFalse(cached_user.is_staff)
+        self.assertEqual(cached_token.payload, token.payload)
+
+    def test_user_save_invalidates_cached_user(self):
+        self.authentication.authenticate(self.request)
+
+        self.user.is_staff = True
+        self.user.save()
+        user, _ = self.authentication.authenticate(self.request)
+        self.assertTrue(user.is_staff)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate(self.request)
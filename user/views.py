@@ -2,6 +2,8 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from airport.conditional import ConditionalGetMixin
+from airport.versions import object_version_names
 from user.serializers import UserSerializer
 
 
@@ -9,10 +11,14 @@ class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     authentication_classes = (JWTAuthentication,)
     permission_classes = (IsAuthenticated,)
+    etag_per_user = True
+
+    def get_etag_versions(self):
+        return object_version_names("user", self.request.user.pk)
 
     def get_object(self):
         return self.request.user